@@ -0,0 +1,71 @@
+"""
+bench_animate.py
+Snapshots of a line, points and an image written as a PNG sequence, by
+building a new figure per snapshot or by swapping the data of one Animation
+
+Usage: python benchmarks/bench_animate.py [number of frames, default 100]
+"""
+
+
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'my_visualization'))
+from main import MyVisualization
+
+
+DPI = 100
+LIMITS = {'xmin': 0, 'xmax': 10, 'ymin': -1.5, 'ymax': 1.5}
+
+
+def snapshot(t):
+    rng = np.random.default_rng(t)
+    xs = np.linspace(0, 10, 1000)
+    points = rng.uniform(0, 10, 2000), rng.normal(0, 0.5, 2000)
+    return [(xs, np.sin(xs + t / 10)), points, rng.random((128, 128))]
+
+
+def draw(vis, frame):
+    (xs, ys), (px, py), image = frame
+    vis.plot(xs, ys, pos='121', silent=True, **LIMITS)
+    vis.scatter(px, py, pos='121', s=2, silent=True, **LIMITS)
+    vis.image(image, pos='122', vmin=0, vmax=1, silent=True)
+
+
+def figures(frames, pattern):
+    """One figure built, styled and saved per frame"""
+    for i, frame in enumerate(frames):
+        with MyVisualization(pyplot=False, dpi=DPI) as vis:
+            draw(vis, frame)
+            vis.save(pattern.format(i), dpi=DPI, transparent=False)
+
+
+def animation(frames, pattern):
+    """One figure, its artists updated per frame"""
+    with MyVisualization(pyplot=False, dpi=DPI) as vis:
+        anim = vis.animation()
+        line = anim.plot(*frames[0][0], pos='121', silent=True, **LIMITS)
+        points = anim.scatter(*frames[0][1], pos='121', s=2, silent=True, **LIMITS)
+        image = anim.image(frames[0][2], pos='122', vmin=0, vmax=1, silent=True)
+        anim.save(({line: f[0], points: f[1], image: f[2]} for f in frames),
+                  pattern)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    frames = [snapshot(t) for t in range(n)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print('{} frames'.format(n))
+        for run in (figures, animation):
+            start = time.perf_counter()
+            run(frames, os.path.join(tmp, run.__name__ + '_{:05d}.png'))
+            seconds = time.perf_counter() - start
+            print('{:>10s} {:>8.3f} s {:>8.2f} ms/frame'.format(
+                run.__name__, seconds, 1e3 * seconds / n))
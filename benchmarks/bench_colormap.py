@@ -0,0 +1,53 @@
+"""
+bench_colormap.py
+Cold and warm timings of the compiled color schemes of my_colordict
+
+Usage: python benchmarks/bench_colormap.py [repeats, default 100]
+"""
+
+
+import io
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'my_visualization'))
+import my_colordict as cdict
+from main import MyVisualization
+
+
+def image(cscheme, xys):
+    """Time an image + save with a given scheme"""
+    start = time.perf_counter()
+    with MyVisualization(pyplot=False, cscheme=cscheme, dpi=72) as vis:
+        vis.image(xys, silent=True)
+        vis.save(io.BytesIO(), dpi=72)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    xys = np.random.default_rng(0).random((256, 256))
+
+    print('{:>10s} {:>14s} {:>14s} {:>14s} {:>14s}'.format(
+        'scheme', 'compile cold', 'compile warm', 'image cold', 'image warm'))
+
+    for name in list(cdict.CDICT):
+        start = time.perf_counter()
+        cdict.compiled(name)
+        cold = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeats): cdict.compiled(name)
+        warm = (time.perf_counter() - start) / repeats
+
+        cdict.register(name, cdict.CDICT[name])
+        imcold = image(name, xys)
+        imwarm = np.mean([image(name, xys) for _ in range(min(repeats, 20))])
+
+        print('{:>10s} {:>12.1f}us {:>12.1f}us {:>12.1f}ms {:>12.1f}ms'.format(
+            name, cold * 1e6, warm * 1e6, imcold * 1e3, imwarm * 1e3))
@@ -0,0 +1,92 @@
+"""
+bench_hist.py
+Histograms of samples read from .npy files, by a loop of np.histogram
+(np.histogram2d) over their chunks or by my_density.Histogram, in one or
+several processes. Every run should count the same samples as the loop,
+including the 'edges' case, whose samples all lie on or next to the edges
+of the bins.
+
+Usage: python benchmarks/bench_hist.py [exponent of the number of samples,
+                                        default 8] [workers, default 4]
+"""
+
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'my_visualization'))
+import my_density as density
+
+
+CHUNKSIZE = 1 << 22
+FILES = ('x.npy', 'y.npy', 'edges.npy')
+CASES = {'linear': (['x.npy'], [(0.0, 100.0)], ['linear'], [1000]),
+         'log': (['x.npy'], [(1e-3, 1e3)], ['log'], [1000]),
+         '2d': (['x.npy', 'y.npy'], [(0.0, 100.0), (-5.0, 5.0)],
+                ['linear', 'linear'], [1000, 1000]),
+         'edges': (['edges.npy'], [(-3.0, 3.0)], ['linear'], [60])}
+
+
+def samples(name, n, seed):
+    """Writing n samples, float32 log-normal or normal, or float64 uniform
+    rounded to 0.1, chunk by chunk"""
+    rng = np.random.default_rng(seed)
+    dtype = np.float64 if seed == 2 else np.float32
+    out = np.lib.format.open_memmap(name, mode='w+', dtype=dtype, shape=(n,))
+    for i in range(0, n, CHUNKSIZE):
+        m = min(CHUNKSIZE, n - i)
+        out[i:i + m] = (rng.lognormal(1, 1, m) if seed == 0 else
+                        rng.normal(0, 1, m) if seed == 1 else
+                        np.round(rng.uniform(-3, 3, m), 1))
+    out.flush()
+
+
+def naive(names, lims, scales, bins, workers):
+    edges = [np.logspace(np.log10(lo), np.log10(hi), n + 1) if scale == 'log'
+             else np.linspace(lo, hi, n + 1)
+             for (lo, hi), scale, n in zip(lims, scales, bins)]
+
+    data = [np.load(name, mmap_mode='r') for name in names]
+    counts = 0
+    for i in range(0, len(data[0]), CHUNKSIZE):
+        chunk = [d[i:i + CHUNKSIZE] for d in data]
+        if len(chunk) == 1: counts += np.histogram(chunk[0], bins=edges[0])[0]
+        else: counts += np.histogram2d(*chunk, bins=edges)[0].astype(np.int64)
+
+    return counts
+
+
+def serial(names, lims, scales, bins, workers):
+    hist = density.Histogram(lims, bins, scales)
+    return hist.fill(*names, chunksize=CHUNKSIZE).values()
+
+
+def parallel(names, lims, scales, bins, workers):
+    hist = density.Histogram(lims, bins, scales)
+    return hist.fill(*names, chunksize=CHUNKSIZE, workers=workers).values()
+
+
+if __name__ == '__main__':
+    n = 10**int(sys.argv[1]) if len(sys.argv) > 1 else 10**8
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for seed, name in enumerate(FILES): samples(os.path.join(tmp, name), n, seed)
+
+        print('{:.0e} samples, {} workers'.format(n, workers))
+        for case, (files, lims, scales, bins) in CASES.items():
+            names = [os.path.join(tmp, name) for name in files]
+            reference = None
+            for run in (naive, serial, parallel):
+                start = time.perf_counter()
+                counts = run(names, lims, scales, bins, workers)
+                seconds = time.perf_counter() - start
+
+                if reference is None: reference = counts
+                print('{:>7s} {:>9s} {:>8.2f} s, {} samples off'.format(
+                    case, run.__name__, seconds,
+                    int(np.abs(counts - reference).sum())))
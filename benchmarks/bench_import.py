@@ -0,0 +1,61 @@
+"""
+bench_import.py
+Time taken by importing my_visualization, and what it pulls in
+
+Usage: python benchmarks/bench_import.py [runs, default 10]
+
+Every import runs in a fresh interpreter. The modules which should stay
+lazy (pyplot, mplot3d, the GUI backends) are listed if they get imported.
+"""
+
+
+import os
+import subprocess
+import sys
+
+
+PACKAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                       'my_visualization')
+
+STATEMENTS = [
+    ('numpy', 'import numpy'),
+    ('matplotlib', 'import matplotlib'),
+    ('matplotlib.pyplot', 'import matplotlib.pyplot'),
+    ('main', 'import main'),
+    ('main + 2D figure', 'import main; main.MyVisualization(pyplot=False)'),
+    ('main + pyplot figure', 'import main; main.MyVisualization()'),
+]
+
+LAZY = ('matplotlib.pyplot', 'mpl_toolkits.mplot3d', 'tkinter', 'PyQt5',
+        'PyQt6', 'PySide6', 'gi', 'wx')
+
+PROBE = '''
+import sys, time
+start = time.perf_counter()
+{}
+print(time.perf_counter() - start)
+print(' '.join(m for m in {!r} if m in sys.modules))
+'''
+
+
+def run(statement):
+    """Seconds taken by statement in a fresh interpreter and lazy modules
+    it imported"""
+    env = dict(os.environ, PYTHONPATH=PACKAGE, MPLBACKEND='')
+    out = subprocess.run([sys.executable, '-c', PROBE.format(statement, LAZY)],
+                         env=env, capture_output=True, text=True, check=True)
+    seconds, modules = (out.stdout.split('\n') + [''])[:2]
+
+    return float(seconds), modules
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    print('{:>20s} {:>10s} {:>10s}  {}'.format('import', 'best [ms]',
+                                               'median [ms]', 'lazy modules loaded'))
+    for name, statement in STATEMENTS:
+        results = [run(statement) for _ in range(runs)]
+        times = sorted(t for t, _ in results)
+        print('{:>20s} {:>10.1f} {:>10.1f}  {}'.format(
+            name, 1e3 * times[0], 1e3 * times[len(times) // 2], results[0][1]))
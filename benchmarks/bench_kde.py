@@ -0,0 +1,81 @@
+"""
+bench_kde.py
+Gaussian kernel density estimates of 2D points, summed over every point at
+every grid point (as scipy.stats.gaussian_kde does) or binned and convolved
+by FFT with my_kde.KDE
+
+Usage: python benchmarks/bench_kde.py [largest exponent of the number of
+                                       points, default 7]
+"""
+
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'my_visualization'))
+import my_density as density
+import my_kde as kde
+
+
+GRID = 64
+DIRECT = 10**5
+
+
+def points(n):
+    rng = np.random.default_rng(n)
+    xs = np.concatenate([rng.normal(0, 1, n - n // 2), rng.normal(4, 0.5, n // 2)])
+    ys = rng.normal(0, 1, n) + 0.3 * xs
+    return xs, ys
+
+
+def direct(xs, ys, gx, gy):
+    """O(N M) sum of the kernels of N points at M grid points"""
+    data = np.vstack([xs, ys])
+    cov = np.cov(data) * len(xs)**(-1 / 3)
+    inv = np.linalg.inv(cov)
+    norm = 2 * np.pi * np.sqrt(np.linalg.det(cov)) * len(xs)
+
+    x, y = np.meshgrid(gx, gy, indexing='ij')
+    values = np.zeros(x.size)
+    for i in range(0, len(xs), 1000):
+        dx = x.reshape(-1, 1) - xs[i:i + 1000]
+        dy = y.reshape(-1, 1) - ys[i:i + 1000]
+        values += np.exp(-0.5 * (inv[0, 0] * dx * dx + 2 * inv[0, 1] * dx * dy +
+                                 inv[1, 1] * dy * dy)).sum(axis=1)
+
+    return (values / norm).reshape(x.shape)
+
+
+def fft(xs, ys):
+    hist = density.Histogram([(xs.min(), xs.max()), (ys.min(), ys.max())],
+                             [kde.BINS, kde.BINS])
+    hist.add(xs, ys)
+    return kde.KDE(hist.values(), hist.edges())
+
+
+if __name__ == '__main__':
+    largest = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+
+    print('{:>10s} {:>12s} {:>12s} {:>10s}'.format(
+        'points', 'direct [s]', 'fft [s]', 'max error'))
+    for e in range(4, largest + 1):
+        xs, ys = points(10**e)
+
+        start = time.perf_counter()
+        estimate = fft(xs, ys)
+        seconds = time.perf_counter() - start
+
+        reference, error = np.nan, np.nan
+        if 10**e <= DIRECT:
+            step = max(1, len(estimate.x) // GRID)
+            gx, gy = estimate.x[::step], estimate.y[::step]
+            start = time.perf_counter()
+            values = direct(xs, ys, gx, gy)
+            reference = time.perf_counter() - start
+            error = np.abs(estimate.values[::step, ::step] - values).max() / values.max()
+
+        print('{:>10.0e} {:>12.3f} {:>12.3f} {:>10.4f}'.format(
+            10**e, reference, seconds, error))
@@ -0,0 +1,64 @@
+"""
+bench_layout.py
+Drawing layers on a 6 x 8 grid of axes, looked up by pyplot.subplot on
+every call or through the axes index of MyVisualization.layout
+
+Usage: python benchmarks/bench_layout.py [layers per panel, default 5]
+"""
+
+
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'my_visualization'))
+from main import MyVisualization
+
+
+NROWS, NCOLS = 6, 8
+
+
+def subplots(xs, nlayers):
+    """Every call searching its axes with pyplot.subplot"""
+    vis = MyVisualization(dpi=72)
+    for layer in range(nlayers):
+        for n in range(1, NROWS * NCOLS + 1):
+            vis.plot(xs, np.sin(xs + layer), ax=plt.subplot(NROWS, NCOLS, n),
+                     silent=True)
+    drawn = time.perf_counter()
+    vis.fig.canvas.draw()
+    vis.close()
+
+    return drawn
+
+
+def indexed(xs, nlayers):
+    """Every call finding its axes in the layout index"""
+    vis = MyVisualization(dpi=72)
+    vis.layout(NROWS, NCOLS)
+    for layer in range(nlayers):
+        for n in range(1, NROWS * NCOLS + 1):
+            vis.plot(xs, np.sin(xs + layer), pos=n, silent=True)
+    drawn = time.perf_counter()
+    vis.fig.canvas.draw()
+    vis.close()
+
+    return drawn
+
+
+if __name__ == '__main__':
+    nlayers = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    xs = np.linspace(0, 10, 200)
+
+    print('{} panels, {} layers each'.format(NROWS * NCOLS, nlayers))
+    for run in (subplots, indexed):
+        start = time.perf_counter()
+        drawn = run(xs, nlayers)
+        end = time.perf_counter()
+        print('{:>10s} {:>8.3f} s calls {:>8.3f} s draw'.format(
+            run.__name__, drawn - start, end - drawn))
@@ -0,0 +1,58 @@
+"""
+bench_many.py
+Many lines drawn by a loop of plot calls or by a single plot_many
+
+Usage: python benchmarks/bench_many.py [number of lines, default 1000]
+"""
+
+
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'my_visualization'))
+from main import MyVisualization
+
+
+SAMPLES = 500
+FORMATS = ('png', 'pdf', 'svg')
+
+
+def draw(vis, xs, ys, many):
+    if many:
+        vis.plot_many(xs, ys, silent=True)
+    else:
+        colors = vis.cscheme['primary_colors']
+        for i, y in enumerate(ys):
+            vis.plot(xs, y, color=colors[i % len(colors)], silent=True)
+
+
+def run(xs, ys, many, fmt):
+    """Seconds to draw and save, and size of the file in bytes"""
+    name = os.path.join(tempfile.gettempdir(), 'bench_many.' + fmt)
+
+    start = time.perf_counter()
+    with MyVisualization(pyplot=False, dpi=100) as vis:
+        draw(vis, xs, ys, many)
+        vis.save(name, dpi=100)
+
+    return time.perf_counter() - start, os.path.getsize(name)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    xs = np.linspace(0, 1, SAMPLES)
+    ys = np.cumsum(np.random.default_rng(0).standard_normal((n, SAMPLES)), axis=1)
+
+    print('{} lines of {} samples'.format(n, SAMPLES))
+    print('{:>8s} {:>12s} {:>12s} {:>12s} {:>12s}'.format(
+        'format', 'plot [s]', 'many [s]', 'plot [kB]', 'many [kB]'))
+    for fmt in FORMATS:
+        (t1, s1), (t2, s2) = run(xs, ys, False, fmt), run(xs, ys, True, fmt)
+        print('{:>8s} {:>12.3f} {:>12.3f} {:>12.1f} {:>12.1f}'.format(
+            fmt, t1, t2, s1 / 1e3, s2 / 1e3))
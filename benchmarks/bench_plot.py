@@ -0,0 +1,55 @@
+"""
+bench_plot.py
+MyVisualization.plot and errorbar with and without min/max decimation
+
+Usage: python benchmarks/bench_plot.py [max exponent, default 7]
+"""
+
+
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'my_visualization'))
+from main import MyVisualization
+
+
+def run(method, n, reduce, ext):
+    """Time a single plot + save of n samples, return seconds and file size"""
+    xs = np.linspace(0, 100, n)
+    ys = np.sin(xs) + np.random.default_rng(n).standard_normal(n)
+    errs = np.full(n, 0.1)
+    name = os.path.join(tempfile.gettempdir(), 'bench_plot.' + ext)
+
+    start = time.perf_counter()
+    vis = MyVisualization(dpi=100)
+    if method == 'plot':
+        vis.plot(xs, ys, reduce=reduce, silent=True)
+    else:
+        vis.errorbar(xs, ys, yerrs=errs, reduce=reduce, silent=True)
+    vis.save(name, dpi=100)
+    vis.plt.close('all')
+
+    return time.perf_counter() - start, os.path.getsize(name)
+
+
+if __name__ == '__main__':
+    maxexp = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+
+    print('{:>9s} {:>5s} {:>9s} {:>12s} {:>12s} {:>12s} {:>12s}'.format(
+        'method', 'ext', 'samples', 'full [s]', 'minmax [s]',
+        'full [kB]', 'minmax [kB]'))
+
+    for method in ('plot', 'errorbar'):
+        for ext in ('png', 'pdf', 'svg'):
+            for exp in range(4, maxexp + 1):
+                full = run(method, 10**exp, None, ext)
+                reduced = run(method, 10**exp, 'minmax', ext)
+                print('{:>9s} {:>5s} {:>9d} {:>12.3f} {:>12.3f} {:>12.0f} {:>12.0f}'.format(
+                    method, ext, 10**exp, full[0], reduced[0],
+                    full[1] / 1e3, reduced[1] / 1e3))
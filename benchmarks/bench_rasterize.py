@@ -0,0 +1,67 @@
+"""
+bench_rasterize.py
+Size and write time of PDF/SVG saves of heavy layers, all vector or with
+the layers above the rasterization threshold rasterized
+
+Usage: python benchmarks/bench_rasterize.py [points, default 200000]
+"""
+
+
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'my_visualization'))
+from main import MyVisualization
+
+
+FORMATS = ('pdf', 'svg')
+DPI = 150
+
+
+def figure(n):
+    rng = np.random.default_rng(0)
+    xs = np.linspace(0, 10, n)
+
+    vis = MyVisualization(pyplot=False, dpi=DPI)
+    vis.plot(xs, np.sin(xs) + 0.1 * rng.standard_normal(n), pos='121',
+             label='line', xlabel='x', silent=True)
+    vis.scatter(rng.standard_normal(n), rng.standard_normal(n), pos='122', s=1,
+                silent=True)
+    vis.legend(pos='121')
+
+    return vis
+
+
+def run(n, fmt, rasterize):
+    """Seconds to save and size of the file in bytes"""
+    name = os.path.join(tempfile.gettempdir(), 'bench_rasterize.' + fmt)
+
+    with figure(n) as vis:
+        start = time.perf_counter()
+        vis.save(name, dpi=DPI, rasterize=rasterize)
+        seconds = time.perf_counter() - start
+        layers = vis.rasterized
+
+    return seconds, os.path.getsize(name), layers
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    print('{:>6s} {:>12s} {:>12s} {:>12s} {:>12s}'.format(
+        'format', 'vector [s]', 'hybrid [s]', 'vector [MB]', 'hybrid [MB]'))
+    for fmt in FORMATS:
+        (t1, s1, _), (t2, s2, layers) = run(n, fmt, None), run(n, fmt, 20000)
+        print('{:>6s} {:>12.2f} {:>12.2f} {:>12.2f} {:>12.2f}'.format(
+            fmt, t1, t2, s1 / 2**20, s2 / 2**20))
+
+    print('\nLayers:')
+    for layer in layers:
+        print('  axes {axes} {layer:>16s} {vertices:>10d} vertices, '
+              'rasterized: {rasterized}'.format(**layer))
@@ -0,0 +1,79 @@
+"""
+bench_render.py
+Re-rendering a dashboard spec with fresh data, on a new MyVisualization per
+render or with my_spec.Plan.render reusing the figure of the plan
+
+Usage: python benchmarks/bench_render.py [number of renders, default 50]
+"""
+
+
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'my_visualization'))
+from main import MyVisualization
+import my_spec as mspec
+
+
+DPI = 100
+SPEC = {
+    'figure': {'dpi': DPI, 'figsize': (12, 8)},
+    'axes': [
+        {'pos': '221', 'xlabel': 't', 'ylabel': 'signal', 'legend': True,
+         'series': [{'kind': 'plot', 'data': ['t', 'a'], 'label': 'a'},
+                    {'kind': 'plot', 'data': ['t', 'b'], 'label': 'b'}]},
+        {'pos': '222', 'xlabel': 'x', 'ylabel': 'y',
+         'series': [{'kind': 'scatter', 'data': ['x', 'y'], 's': 2}]},
+        {'pos': '223', 'xlabel': 'a', 'yscale': 'log',
+         'series': [{'kind': 'hist', 'data': ['a'], 'bins': 50}]},
+        {'pos': '224',
+         'series': [{'kind': 'image', 'data': ['field'], 'vmin': 0, 'vmax': 1}]},
+    ],
+}
+
+
+def snapshot(i):
+    rng = np.random.default_rng(i)
+    t = np.linspace(0, 10, 5000)
+    return {'t': t, 'a': np.sin(t + i / 10) + rng.normal(0, 0.1, t.size),
+            'b': np.cos(t + i / 10), 'x': rng.normal(0, 1, 2000),
+            'y': rng.normal(0, 1, 2000), 'field': rng.random((128, 128))}
+
+
+def figures(plan, snapshots):
+    """A new figure per render"""
+    for data in snapshots:
+        with MyVisualization(pyplot=False, **plan.figure) as vis:
+            vis.render(plan, data)
+            rgba = vis.rgba(dpi=DPI).copy()
+    return rgba
+
+
+def plan(plan, snapshots):
+    """The figure of the plan, its series redrawn per render"""
+    for data in snapshots:
+        rgba = plan.render(data).rgba(dpi=DPI).copy()
+    plan.close()
+    return rgba
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    snapshots = [snapshot(i) for i in range(n)]
+
+    print('{} renders'.format(n))
+    reference = None
+    for run in (figures, plan):
+        start = time.perf_counter()
+        rgba = run(mspec.Plan(SPEC), snapshots)
+        seconds = time.perf_counter() - start
+
+        if reference is None: reference = rgba
+        print('{:>8s} {:>8.3f} s {:>8.2f} ms/render, last render {} pixels off'.format(
+            run.__name__, seconds, 1e3 * seconds / n,
+            int(np.any(rgba != reference, axis=-1).sum())))
@@ -0,0 +1,48 @@
+"""
+bench_scatter.py
+Scaling of MyVisualization.scatter with and without density reduction
+
+Usage: python benchmarks/bench_scatter.py [max exponent, default 8]
+"""
+
+
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'my_visualization'))
+from main import MyVisualization
+
+
+DIRECT_LIMIT = 10**6
+
+
+def run(n, reduce):
+    """Time a single scatter + save for n points"""
+    rng = np.random.default_rng(n)
+    xs = rng.standard_normal(n, dtype=np.float32)
+    ys = rng.standard_normal(n, dtype=np.float32)
+
+    start = time.perf_counter()
+    vis = MyVisualization(dpi=100)
+    vis.scatter(xs, ys, s=1, reduce=reduce, silent=True)
+    vis.save(os.path.join(tempfile.gettempdir(), 'bench_scatter.png'), dpi=100)
+    vis.plt.close('all')
+
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    maxexp = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+
+    print('{:>12s} {:>12s} {:>12s}'.format('points', 'direct [s]', 'density [s]'))
+    for exp in range(4, maxexp + 1):
+        n = 10**exp
+        direct = run(n, None) if n <= DIRECT_LIMIT else float('nan')
+        reduced = run(n, 'density')
+        print('{:>12d} {:>12.3f} {:>12.3f}'.format(n, direct, reduced))
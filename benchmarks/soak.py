@@ -0,0 +1,61 @@
+"""
+soak.py
+Resident memory over many render cycles of MyVisualization(pyplot=False)
+
+Usage: python benchmarks/soak.py [cycles, default 10000]
+
+Exits with a non-zero status if the RSS grows by more than 10% between the
+end of the warm-up and the last cycle.
+"""
+
+
+import io
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'my_visualization'))
+from main import MyVisualization
+
+
+WARMUP = 200
+REPORT = 1000
+TOLERANCE = 1.1
+
+
+def rss():
+    """Current resident set size in MB"""
+    with open('/proc/self/statm') as statm:
+        pages = int(statm.read().split()[1])
+    return pages * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+def cycle(xs, ys):
+    """One render cycle, saved to memory"""
+    with MyVisualization(pyplot=False, dpi=72) as vis:
+        vis.plot(xs, ys, xlabel='x', ylabel='y', silent=True)
+        vis.scatter(xs, ys, silent=True)
+        vis.save(io.BytesIO(), dpi=72)
+
+
+if __name__ == '__main__':
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    xs = np.linspace(0, 1, 1000)
+    ys = np.sin(10 * xs)
+
+    start, baseline = time.perf_counter(), None
+    print('{:>8s} {:>10s} {:>10s}'.format('cycle', 'RSS [MB]', 'time [s]'))
+
+    for i in range(1, cycles + 1):
+        cycle(xs, ys)
+        if i == WARMUP: baseline = rss()
+        if i % REPORT == 0 or i == cycles:
+            print('{:>8d} {:>10.1f} {:>10.1f}'.format(
+                i, rss(), time.perf_counter() - start))
+
+    if baseline is not None and rss() > TOLERANCE * baseline:
+        sys.exit('RSS grew from {:.1f} MB to {:.1f} MB'.format(baseline, rss()))
@@ -0,0 +1,197 @@
+"""
+suite.py
+Wall time and peak memory of every MyVisualization entry point, across
+input sizes and output formats, optionally compared to a stored baseline
+
+Usage: python benchmarks/suite.py [--sizes 3 4 5] [--output results.json]
+                                  [--baseline baseline.json] [--threshold 0.25]
+
+Every case runs on a new MyVisualization, built before the timer starts.
+Drawing cases are timed up to a rendered canvas, so the lazy work of
+matplotlib is included, and save cases plot before the timer starts, so
+they time save alone. Times are the best of untraced runs, and peak memory
+the peak of the Python and NumPy allocations of one more run traced by
+tracemalloc, which slows the traced code down several times, unevenly.
+
+With a baseline, exits with a non-zero status and a diff of the offending
+cases if any of them got slower, or used more memory, by more than the
+threshold.
+"""
+
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'my_visualization'))
+from main import MyVisualization
+
+
+REPEAT = 3
+FORMATS = ('png', 'pdf', 'svg')
+MINTIME = 0.01
+MINMEMORY = 1.0
+
+
+def data(n, dims=2):
+    rng = np.random.default_rng(n)
+    xs = np.linspace(0, 10, n)
+    return [xs] + [np.sin(xs) + rng.standard_normal(n) for _ in range(dims - 1)]
+
+
+def plot(vis, n):
+    vis.plot(*data(n), silent=True)
+
+
+def errorbar(vis, n):
+    xs, ys = data(n)
+    vis.errorbar(xs, ys, yerrs=np.full(n, 0.1), silent=True)
+
+
+def errorbar_shaded(vis, n):
+    xs, ys = data(n)
+    vis.errorbar(xs, ys, yerrs=np.full(n, 0.1), shaded=True, silent=True)
+
+
+def image(vis, n):
+    side = int(np.sqrt(n))
+    vis.image(np.random.default_rng(n).random((side, side)), silent=True)
+
+
+def scatter(vis, n):
+    vis.scatter(*data(n), s=1, reduce='auto', silent=True)
+
+
+def scatter3d(vis, n):
+    vis.scatter3d(*data(n, 3), s=1, reduce='auto', silent=True)
+
+
+def plot3d(vis, n):
+    vis.plot3d(*data(n, 3), reduce='auto', silent=True)
+
+
+def coaxis(vis, n):
+    vis.plot(*data(n), silent=True)
+    ticks = np.linspace(1, 9, 9)
+    vis.coaxis(ticks, ['{:.0f}'.format(t) for t in ticks], 'coaxis')
+
+
+def legend(vis, n):
+    xs, ys = data(n)
+    for i in range(5): vis.plot(xs, ys + i, label='line {}'.format(i), silent=True)
+    vis.legend()
+
+
+CASES = (plot, errorbar, errorbar_shaded, image, scatter, scatter3d, plot3d,
+         coaxis, legend)
+
+
+def measure(prepare):
+    """Best wall time of REPEAT untraced runs and peak traced memory in MB
+    of one more run, prepare() returning a MyVisualization and the run"""
+    times, peak = [], 0
+
+    for i in range(REPEAT + 1):
+        vis, run = prepare()
+        with vis:
+            if i == REPEAT: tracemalloc.start()
+            start = time.perf_counter()
+            run()
+            seconds = time.perf_counter() - start
+
+        if i < REPEAT:
+            times.append(seconds)
+        else:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    return {'time': min(times), 'memory': peak / 2**20}
+
+
+def draw(case, n):
+    def prepare():
+        vis = MyVisualization(pyplot=False, dpi=100)
+        def run():
+            case(vis, n)
+            vis.fig.canvas.draw()
+        return vis, run
+    return prepare
+
+
+def save(fmt, n):
+    name = os.path.join(tempfile.gettempdir(), 'bench_suite.' + fmt)
+    def prepare():
+        vis = MyVisualization(pyplot=False, dpi=100)
+        plot(vis, n)
+        return vis, lambda: vis.save(name, dpi=100)
+    return prepare
+
+
+def suite(sizes):
+    results = {}
+    for n in sizes:
+        for case in CASES:
+            results['{}[{}]'.format(case.__name__, n)] = measure(draw(case, n))
+        for fmt in FORMATS:
+            results['save_{}[{}]'.format(fmt, n)] = measure(save(fmt, n))
+
+    return results
+
+
+def regressions(results, baseline, threshold):
+    """Cases slower or bigger than baseline by more than threshold"""
+    worse = []
+    for key in sorted(set(results) & set(baseline)):
+        for metric, floor in (('time', MINTIME), ('memory', MINMEMORY)):
+            old, new = baseline[key][metric], results[key][metric]
+            if new > old * (1 + threshold) and new - old > floor:
+                worse.append((key, metric, old, new))
+
+    return worse
+
+
+def report(results, baseline=None):
+    print('{:>24s} {:>10s} {:>10s} {:>10s} {:>10s}'.format(
+        'case', 'time [s]', 'base [s]', 'mem [MB]', 'base [MB]'))
+    for key, r in results.items():
+        b = (baseline or {}).get(key, {'time': np.nan, 'memory': np.nan})
+        print('{:>24s} {:>10.3f} {:>10.3f} {:>10.1f} {:>10.1f}'.format(
+            key, r['time'], b['time'], r['memory'], b['memory']))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[2])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[3, 4, 5],
+                        help='exponents of the input sizes, default: 3 4 5')
+    parser.add_argument('--output', help='writing the results to a JSON file')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative slowdown or growth failing a case')
+    args = parser.parse_args()
+
+    results = suite([10**e for e in args.sizes])
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f: baseline = json.load(f)
+
+    report(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f: json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        worse = regressions(results, baseline, args.threshold)
+        for key, metric, old, new in worse:
+            print('REGRESSION {} {}: {:.3f} -> {:.3f} ({:+.0f}%)'.format(
+                key, metric, old, new, 100 * (new / old - 1)))
+        if worse: sys.exit('{} regression(s) above {:.0f}%'.format(
+            len(worse), 100 * args.threshold))
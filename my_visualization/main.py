@@ -4,21 +4,75 @@ Main class of my_visualization package
 """
 
 
-import random
+import functools
+import io
+import os
+import sys
+import weakref
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
 import matplotlib.colors as mcolors
-from mpl_toolkits.mplot3d import Axes3D
 from matplotlib.ticker import LogFormatter
 
+import my_animate as animate
+import my_cache as mcache
 import my_colordict as cdict
+import my_decimate as decimate
+import my_density as mdensity
+import my_export as export
+import my_kde as kde
+import my_live as live
+import my_norm as mnorm
+import my_profile as mprofile
+import my_spec as mspec
+import my_pyramid as mpyramid
+import my_stream as stream
+
+
+def _profiled(method):
+    """Timing the calls of a method with the profiler of the instance, if any"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kws):
+        if self.profiler is None: return method(self, *args, **kws)
+
+        self.profiler.begin(method.__name__)
+        try:
+            return method(self, *args, **kws)
+        finally:
+            self.profiler.end()
+
+    return wrapper
+
+
+def _recorded(method):
+    """Feeding the calls of a method to the cache recorder of the instance,
+    logging their keyword arguments and timing them"""
+    profiled = _profiled(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kws):
+        if self.calls is not None: self.calls.update(method.__name__, args, kws)
+        mprofile.logcall(method.__name__, kws)
+        return profiled(self, *args, **kws)
+
+    return wrapper
+
+
+def _backend():
+    """Backend chosen by MPLBACKEND, the matplotlibrc or matplotlib.use,
+    None if matplotlib would select one itself"""
+    try:
+        return matplotlib.get_backend(auto_select=False)
+    except TypeError:
+        return matplotlib.rcParams._get_backend_or_none()
 
 
 class MyVisualization:
     """Visualization class"""
 
     def __init__(self, aspect=1, figsize=None, tickfontsize=12,
-                 labelfontsize=18, cscheme='RAINBOW'):
+                 labelfontsize=18, cscheme='RAINBOW', dpi=360, pyplot=True,
+                 cache=None, profile=False):
         """MyVisualization constructor
 
         Parameters
@@ -31,14 +85,73 @@ class MyVisualization:
             Font size of the ticks of the plot
         labelfontsize : int
             Font size of plots label
+        cscheme : str, optional
+            Name of the color scheme from my_colordict module
+        dpi : int, optional
+            Target resolution, used to size pixel-resolution grids
+        pyplot : bool, optional
+            If False, the figure is a matplotlib.figure.Figure with its own
+            Agg canvas, unknown to pyplot, so no global state is involved
+            and pyplot, with its backend selection, is never imported.
+            If True, pyplot uses the backend chosen by MPLBACKEND, the
+            matplotlibrc or matplotlib.use, and Agg if none was chosen,
+            instead of probing the GUI toolkits.
+            Either way, the figure should be released with close() or by
+            using the instance as a context manager.
+        cache : str or my_cache.FigureCache, optional
+            Directory (or cache) of rendered figures. save() then reuses the
+            file rendered from the same calls, data, color scheme, save
+            settings, rcParams and versions of the package and matplotlib.
+            Changes made directly on the matplotlib objects are not seen by
+            the cache.
+        profile : bool or callable, optional
+            Recording the time and net allocated blocks of every call,
+            split into stages (prepare, draw, style, save), in
+            self.profiler, see my_profile.Profiler. A callable is called
+            with every record.
+            Records are also logged to the 'my_visualization' logger at
+            DEBUG level, as are the keyword arguments of every call.
         """
-        self.plt = plt
+        self.pyplot = pyplot
         self.tickfontsize = tickfontsize
         self.labelfontsize = labelfontsize
+        self.dpi = dpi
         self.cscheme = cdict.get(cscheme)
-
-        figsize = figsize if figsize != None else plt.figaspect(aspect)
-        self.plt.figure(random.randint(1, 100000), figsize=figsize)
+        self.__cschemename = cscheme
+
+        self.profiler = None
+        if profile:
+            self.profiler = mprofile.Profiler(
+                callback=profile if callable(profile) else None)
+
+        from matplotlib.figure import Figure, figaspect
+
+        figsize = figsize if figsize != None else figaspect(aspect)
+
+        self.cache = mcache.FigureCache(cache) if isinstance(cache, str) else cache
+        self.calls = None
+        if self.cache is not None:
+            self.calls = mcache.Recorder()
+            self.calls.update('MyVisualization', (), {
+                'figsize': tuple(figsize), 'tickfontsize': tickfontsize,
+                'labelfontsize': labelfontsize, 'cscheme': self.cscheme,
+                'dpi': dpi})
+
+        if pyplot:
+            self.fig = self.plt.figure(figsize=figsize)
+        else:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            self.fig = Figure(figsize=figsize)
+            FigureCanvasAgg(self.fig)
+
+        self.__axes = {}
+        self.__styled = weakref.WeakSet()
+        self.__planned = weakref.WeakSet()
+        self.__colorbars = weakref.WeakKeyDictionary()
+        self.__twins = {}
+        self.__live = None
+        self.__rendered = None
+        self.__resolved = None
 
         self.defaults = [
             ('label', ''),
@@ -53,17 +166,70 @@ class MyVisualization:
             ('silent', False),
         ]
 
+        self.reductions = []
+        self.rasterized = []
+
+
+    @property
+    def plt(self):
+        """matplotlib.pyplot, imported on first use, with the Agg backend
+        unless one was chosen"""
+        if 'matplotlib.pyplot' not in sys.modules and _backend() is None:
+            matplotlib.use('Agg')
+
+        import matplotlib.pyplot as plt
+        return plt
+
+
+    @property
+    def compiled(self):
+        """Compiled color scheme, see my_colordict.compiled, built on first use"""
+        return cdict.compiled(self.__cschemename)
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
 
-    def plot(self, xs, ys, pos="111", ax=None, **kws):
+
+    def close(self):
+        """Releasing the figure, the instance can't be used afterwards"""
+        if self.fig is None: return
+
+        if self.pyplot: self.plt.close(self.fig)
+        else: self.fig.clear()
+
+        self.__axes.clear()
+        self.__styled.clear()
+        self.__planned.clear()
+        self.__colorbars.clear()
+        self.__twins.clear()
+        self.__live = None
+        self.__rendered = None
+        self.fig = None
+
+
+    @_recorded
+    def plot(self, xs, ys=None, pos="111", ax=None, reduce=None, **kws):
         """plot
 
         Parameters
         ----------
-        xs, ys : list
+        xs, ys : list, np.memmap, path to a .npy file or iterator of chunks
+            Memory-mapped, file and chunked inputs are read in a single pass
+            and reduced to their min/max envelope. If ys is None, xs should
+            yield (xs, ys) chunks.
         pos : str, optional
             Position of the subplot inside the figure
         ax : Axes obj, optional
             Axes generated by new2daxes
+        reduce : None, 'auto' or 'minmax', optional
+            Drawing only the minimum and maximum of every pixel column, see
+            my_decimate.minmax. Lines shorter than twice the width in pixels
+            are drawn as they are.
 
         Keyword Arguments
         -----------------
@@ -79,31 +245,48 @@ class MyVisualization:
         alpha: float, optional
         """
 
-        if ax is None: ax = self.plt.subplot(pos)
+        if ax is None: ax = self.__subplot(pos)
 
         params = self.__getparams(**kws)
-        if not params['silent'] == True: self.__printargs("\"plot\"", **kws)
 
+        if stream.isstream(xs, ys):
+            envelope = decimate.Envelope(self.__pixels(ax)[0])
+            for x, y in stream.chunks(xs, ys): envelope.add(x, y)
+            xs, ys = envelope.vertices()
+            self.__reduced("plot", envelope.count, len(ys), params['silent'])
+        elif reduce in ('auto', 'minmax'):
+            i = self.__minmax(ax, xs, ys, **kws)
+            self.__reduced("plot", len(ys), len(i), params['silent'])
+            xs, ys = np.asarray(xs)[i], np.asarray(ys)[i]
+
+        self.__stage('draw')
         ax.plot(xs, ys, color=params['color'], linestyle=params['linestyle'],
                 label=params['label'], alpha=params['alpha'])
 
-        self.__setscales(**kws)
-        self.__setlabels(**kws)
-        self.__setarea(**kws)
-        self.__stylespines(**kws)
-        self.__setaxiscolor(**kws)
+        self.__stage('style')
+        self.__setscales(ax=ax, **kws)
+        self.__setlabels(ax=ax, **kws)
+        self.__setarea(ax=ax, **kws)
+        self.__style(ax)
 
 
-    def errorbar(self, xs, ys, xerrs=None, yerrs=None, pos="111", ax=None, **kws):
+    @_recorded
+    def errorbar(self, xs, ys, xerrs=None, yerrs=None, pos="111", ax=None,
+                 reduce=None, **kws):
         """Plotting with error bars
 
         Parameters
         ----------
         xs, ys, xerrs, yerrs : list
+            Errors are either symmetric, N values, or asymmetric, 2xN values
+            of (lower, upper) errors
         pos : str, optional
             Position of the subplot inside the figure
         ax : Axes obj, optional
             Axes generated by new2daxes
+        reduce : None, 'auto' or 'minmax', optional
+            Drawing only the points (and their errors) which are the minimum
+            or the maximum of their pixel column, see my_decimate.minmax
 
         Keyword Arguments
         -----------------
@@ -113,6 +296,8 @@ class MyVisualization:
         shaded : bool, optional
         shadedcolor : string, optional
         shadedalpha : float, optional
+        shadedsigmas : list of numbers, optional
+            Multiples of yerrs to shade, stacked, e.g. [1, 2, 3], default: [1]
         linestyle : str, optional
         xscale, yscale : str, optional
         xmin, xmax, ymin, ymax : float, optional
@@ -120,44 +305,197 @@ class MyVisualization:
         """
         k = kws.get
 
-        if ax is None: ax = self.plt.subplot(pos)
+        if ax is None: ax = self.__subplot(pos)
 
         params = self.__getparams(**kws)
-        if not params['silent'] == True: self.__printargs("\"errorbar\"", **kws)
+
+        self.__stage('draw')
+        if k('shaded') is True and yerrs is not None:
+            self.__shade(ax, xs, ys, yerrs, params, reduce=reduce, **kws)
+
+        if reduce in ('auto', 'minmax'):
+            i = self.__minmax(ax, xs, ys, **kws)
+            self.__reduced("errorbar", len(ys), len(i), params['silent'])
+            xs, ys = np.asarray(xs)[i], np.asarray(ys)[i]
+            if np.ndim(xerrs) > 0: xerrs = np.asarray(xerrs)[..., i]
+            if np.ndim(yerrs) > 0: yerrs = np.asarray(yerrs)[..., i]
 
         ax.errorbar(xs, ys, xerr=xerrs, yerr=yerrs,
             color=params['color'], ecolor=params['ecolor'],
             linestyle=params['linestyle'], label=params['label'])
 
-        if 'shaded' in kws and k('shaded') is True and yerrs != None:
-            ylow = [y - yerr for y, yerr in zip(ys, yerrs)]
-            yhigh = [y + yerr for y, yerr in zip(ys, yerrs)]
+        self.__stage('style')
+        self.__setscales(ax=ax, **kws)
+        self.__setlabels(ax=ax, **kws)
+        self.__setarea(ax=ax, **kws)
+        self.__style(ax)
 
-            c = k('shadedcolor') if 'shadedcolor' in kws else params['shadow']
-            alpha = k('shadedalpha') if 'shadedalpha' in kws else 1.0
 
-            ax.fill_between(xs, ylow, yhigh, facecolor=c, edgecolor=c,
-                            alpha=alpha, interpolate=interpolate)
+    @_recorded
+    def plot_many(self, xs, ys=None, pos="111", ax=None, reduce=None, **kws):
+        """Plotting many lines as a single LineCollection
 
-        self.__setscales(**kws)
-        self.__setlabels(**kws)
-        self.__setarea(**kws)
-        self.__stylespines(**kws)
-        self.__setaxiscolor(**kws)
+        Parameters
+        ----------
+        xs, ys : 2D array, or list of arrays of different lengths
+            One row (or array) per line. xs may also be a single array
+            shared by all lines. If ys is None, xs are the ys of the lines,
+            drawn against their indices.
+        pos : str, optional
+        ax : Axes obj, optional
+        reduce : None, 'auto' or 'minmax', optional
+            Reducing every line to its min/max envelope, see plot
 
+        Keyword Arguments
+        -----------------
+        label : str, optional
+            One legend entry for all the lines
+        color : str or list of str, optional
+            Default: cycling through the primary colors of the color scheme
+        linestyle : str, optional
+        linewidth : float, optional
+        alpha: float, optional
+        xscale, yscale : str, optional
+        xmin, xmax, ymin, ymax : float, optional
+        xlabel, ylabel : str, optional
+        """
+        from matplotlib.collections import LineCollection
 
+        if ax is None: ax = self.__subplot(pos)
+
+        params = self.__getparams(**kws)
+        lines = self.__series(xs, ys)
+        lines = self.__reducemany("plot_many", ax, lines, reduce, params, **kws)
+
+        self.__stage('draw')
+        segments = [np.column_stack([x, y]) for x, y in lines]
+        ax.add_collection(LineCollection(
+            segments, colors=self.__colors(len(lines), 'primary_colors', **kws),
+            linestyles=params['linestyle'], linewidths=params['linewidth'],
+            alpha=params['alpha'], label=params['label']))
+        ax.autoscale_view()
+
+        self.__stage('style')
+        self.__setscales(ax=ax, **kws)
+        self.__setlabels(ax=ax, **kws)
+        self.__setarea(ax=ax, **kws)
+        self.__style(ax)
+
+
+    @_recorded
+    def errorbar_many(self, xs, ys, yerrs, pos="111", ax=None, reduce=None,
+                      **kws):
+        """Plotting many lines with y errors, as a single LineCollection for
+        the lines and a single collection for all their errors
+
+        Parameters
+        ----------
+        xs, ys : 2D array, or list of arrays of different lengths
+            See plot_many
+        yerrs : 2D array, or list of arrays
+            Per line, either symmetric, N values, or asymmetric, 2xN values
+            of (lower, upper) errors
+        pos : str, optional
+        ax : Axes obj, optional
+        reduce : None, 'auto' or 'minmax', optional
+            Reducing every line, and its errors, to its min/max envelope
+
+        Keyword Arguments
+        -----------------
+        label : str, optional
+        color : str or list of str, optional
+            Default: cycling through the primary colors of the color scheme
+        shaded : bool, optional
+            Drawing the errors as bands, in a single PolyCollection, instead
+            of error bars
+        shadedcolor : str or list of str, optional
+            Default: cycling through the primary shadows of the color scheme
+        shadedalpha : float, optional
+        shadedsigmas : list of numbers, optional
+            Multiples of yerrs to shade, stacked, e.g. [1, 2, 3], default: [1]
+        linestyle : str, optional
+        xscale, yscale : str, optional
+        xmin, xmax, ymin, ymax : float, optional
+        xlabel, ylabel : str, optional
+        """
+        from matplotlib.collections import LineCollection, PolyCollection
+
+        k = kws.get
+
+        if ax is None: ax = self.__subplot(pos)
+
+        params = self.__getparams(**kws)
+        lines = [(x, y, self.__errors(np.asarray(e, dtype=np.float64)))
+                 for (x, y), e in zip(self.__series(xs, ys), yerrs)]
+        lines = self.__reducemany("errorbar_many", ax, lines, reduce, params, **kws)
+
+        self.__stage('draw')
+        n = len(lines)
+
+        if k('shaded') is True:
+            sigmas = sorted(k('shadedsigmas') or [1], reverse=True)
+            shadows = self.__colors(n, 'primary_shadows', key='shadedcolor', **kws)
+            bands = [np.column_stack([np.r_[x, x[::-1]],
+                                      np.r_[y - sigma * lo, (y + sigma * hi)[::-1]]])
+                     for sigma in sigmas for x, y, (lo, hi) in lines]
+            alpha = k('shadedalpha') if 'shadedalpha' in kws else 1.0 / len(sigmas)
+            ax.add_collection(PolyCollection(
+                bands, facecolors=shadows * len(sigmas),
+                edgecolors=shadows * len(sigmas), alpha=alpha))
+        else:
+            bars = [np.stack([np.column_stack([x, y - lo]),
+                              np.column_stack([x, y + hi])], axis=1)
+                    for x, y, (lo, hi) in lines]
+            ax.add_collection(LineCollection(
+                np.concatenate(bars) if bars else [], colors=params['ecolor']))
+
+        ax.add_collection(LineCollection(
+            [np.column_stack([x, y]) for x, y, _ in lines],
+            colors=self.__colors(n, 'primary_colors', **kws),
+            linestyles=params['linestyle'], linewidths=params['linewidth'],
+            label=params['label']))
+        ax.autoscale_view()
+
+        self.__stage('style')
+        self.__setscales(ax=ax, **kws)
+        self.__setlabels(ax=ax, **kws)
+        self.__setarea(ax=ax, **kws)
+        self.__style(ax)
+
+
+    @_recorded
     def image(self, xys, pos="111", ax=None, vmin=None, vmax=None,
-                interpolation=None, **kws):
+                interpolation=None, pyramid=None, norm=None, percentiles=(1, 99),
+                width=None, **kws):
         """Density plot
 
         Parameters:
         ----------
-        xys : 2D Array
+        xys : 2D Array, np.memmap, path to a .npy file, iterator of row blocks
+              or my_pyramid.Pyramid
+            Memory-mapped, file and chunked inputs are read block by block and
+            averaged down to the resolution of the axes. With a pyramid, only
+            the level matching the resolution of the axes is read, and only
+            the blocks inside xmin, xmax, ymin, ymax.
         pos : str, optional
         ax : Axes obj, optional
         vmin, vmax : float or None
+            Default: min/max of the data, or of the pyramid tiles drawn
         interpolation: str, optional
             anti aliasing, default: None
+        pyramid : bool or str, optional
+            Building a my_pyramid.Pyramid of xys first, persisted in the
+            given directory if a str. Pass the Pyramid itself as xys to
+            reuse it across calls.
+        norm : str, optional
+            'percentile', 'log', 'symlog', 'asinh' or 'hist' (histogram
+            equalization), with statistics taken from a strided sample of
+            the data, which is then drawn in float32. Default: linear
+        percentiles : tuple of float, optional
+            Lower and upper percentiles clipped by norm='percentile'
+        width : float, optional
+            Range around zero kept linear by norm='symlog' and 'asinh',
+            default: median of the absolute values
 
         Keyword Arguments
         -----------------
@@ -167,76 +505,331 @@ class MyVisualization:
         xlabel, ylabel : str, optional
         """
 
-        if ax is None: ax = self.plt.subplot(pos)
+        if ax is None: ax = self.__subplot(pos)
 
         params = self.__getparams(**kws)
-        if not params['silent'] == True: self.__printargs("\"image\"", **kws)
-
-        cmap = mcolors.LinearSegmentedColormap('CustomMap', self.cscheme['dict'])
-
-        if vmin is None: vmin = np.amin(xys)
-        if vmax is None: vmax = np.amax(xys)
 
-        ax.imshow(xys, cmap=cmap, vmin=vmin, vmax=vmax, interpolation=interpolation)
-
-        self.__setscales(**kws)
-        self.__setlabels(**kws)
-        self.__setarea(**kws)
-        self.__stylespines(**kws)
-        self.__setaxiscolor(**kws)
-
-
-    def scatter(self, xs, ys, pos="111", ax=None, s=10, **kws):
+        cmap = self.compiled['cmap']
+
+        extent, area = None, None
+        if pyramid and not isinstance(xys, mpyramid.Pyramid):
+            directory = pyramid if isinstance(pyramid, str) else None
+            xys = mpyramid.Pyramid(xys, directory=directory)
+
+        if isinstance(xys, mpyramid.Pyramid):
+            crop = self.__crop(xys.shape, **kws)
+            level = xys.level(self.__pixels(ax), crop)
+            xys, extent, limits = xys.read(level, crop)
+            if vmin is None: vmin = limits[0]
+            if vmax is None: vmax = limits[1]
+        elif stream.isstream(xys):
+            xys, extent, limits, area = stream.image(xys, self.__pixels(ax))
+            if vmin is None: vmin = limits[0]
+            if vmax is None: vmax = limits[1]
+
+        if norm is None:
+            if vmin is None: vmin = np.amin(xys)
+            if vmax is None: vmax = np.amax(xys)
+            self.__stage('draw')
+            im = ax.imshow(xys, cmap=cmap, vmin=vmin, vmax=vmax,
+                           interpolation=interpolation, extent=extent)
+        else:
+            xys = stream.load(xys)
+            if xys.dtype.itemsize > 4: xys = xys.astype(np.float32)
+            scaling = mnorm.norm(xys, norm, vmin=vmin, vmax=vmax,
+                                 percentiles=percentiles, width=width)
+            self.__stage('draw')
+            im = ax.imshow(xys, cmap=cmap, norm=scaling,
+                           interpolation=interpolation, extent=extent)
+
+        if area is not None:
+            ax.set_xlim(area[:2])
+            ax.set_ylim(area[2:])
+        if ax in self.__colorbars: self.__colorbar(ax, im)
+
+        self.__stage('style')
+        self.__setscales(ax=ax, **kws)
+        self.__setlabels(ax=ax, **kws)
+        self.__setarea(ax=ax, **kws)
+        self.__style(ax)
+
+
+    @_recorded
+    def scatter(self, xs, ys=None, pos="111", ax=None, s=10, reduce=None,
+                max_points=100000, contours=None, **kws):
         """Scatter plot with histogram
 
         Parameters:
         ----------
-        xs, ys : list
+        xs, ys : list, np.memmap, path to a .npy file or iterator of chunks
+            Memory-mapped, file and chunked inputs are always reduced to a
+            density image in a single pass. If ys is None, xs should yield
+            (xs, ys) chunks.
         pos : str, optional
         ax : Axes obj, optional
         s : int, optional
+        reduce : None, 'auto' or 'density', optional
+            'density' bins the points into a pixel-resolution histogram,
+            drawn as an image, and keeps points which are alone in their
+            pixel as markers. 'auto' does so above max_points points.
+        max_points : int, optional
+        contours : bool or list of float, optional
+            Overlaying density contours enclosing these probabilities (True:
+            my_kde.LEVELS) of the points, see density
 
         Keyword Arguments
         -----------------
         label : str, optional
         color : str, optional
+        contourcolor : str, optional
+            Default: cycling through the primary colors, one per level
         xscale, yscale : str, optional
         xmin, xmax, ymin, ymax : float, optional
         xlabel, ylabel, zlabel : str, optional
         alpha : float
         """
         k = kws.get
-        if ax is None: ax = self.plt.subplot(pos)
+        if ax is None: ax = self.__subplot(pos)
 
-        params = _getparams(**kws)
-        if not params['silent'] == True: self.__printargs("\"scatter\"", **kws)
+        params = self.__getparams(**kws)
 
         alpha = k('alpha') if 'alpha' in kws else None
 
+        grid = None
+        if stream.isstream(xs, ys):
+            grid = mdensity.Grid2D(None, None, self.__pixels(ax),
+                                   xscale=k('xscale'), yscale=k('yscale'))
+            for x, y in stream.chunks(xs, ys): grid.add(x, y)
+            xs, ys = grid.bounds[:2], grid.bounds[2:]
+
         xmin = k('xmin') if 'xmin' in kws else np.min(xs)
         xmax = k('xmax') if 'xmax' in kws else np.max(xs)
         ymin = k('ymin') if 'ymin' in kws else np.min(ys)
         ymax = k('ymax') if 'ymax' in kws else np.max(ys)
 
-        xlim = (np.min([xmin, self.plt.gca().get_xlim()[0]]),
-                np.max([xmax, self.plt.gca().get_xlim()[1]]))
+        xlim = (np.min([xmin, ax.get_xlim()[0]]),
+                np.max([xmax, ax.get_xlim()[1]]))
 
-        ylim = (np.min([ymin, self.plt.gca().get_ylim()[0]]),
-                np.max([ymax, self.plt.gca().get_ylim()[1]]))
+        ylim = (np.min([ymin, ax.get_ylim()[0]]),
+                np.max([ymax, ax.get_ylim()[1]]))
 
-        self.plt.gca().set_xlim(xlim)
-        self.plt.gca().set_ylim(ylim)
+        if grid is None and (reduce == 'density' or
+                             (reduce == 'auto' and len(xs) > max_points)):
+            grid = mdensity.Grid2D((xmin, xmax), (ymin, ymax), self.__pixels(ax),
+                                   xscale=k('xscale'), yscale=k('yscale'))
+            grid.add(xs, ys)
 
-        self.plt.scatter(xs, ys, c=params['color'], marker='o', s=s,
-                         edgecolors='none', lw=0, alpha=alpha)
+        self.__stage('draw')
+        if grid is not None:
+            self.__drawgrid(ax, grid, alpha=alpha)
+            xs, ys = grid.lone()
+            self.__reduced("scatter", grid.counts.sum(),
+                           np.count_nonzero(grid.counts), params['silent'])
 
-        self.__setscales(**kws)
-        self.__setlabels(**kws)
-        self.__setaxiscolor(**kws)
-        self.__stylespines(**kws)
-        self.__setarea(**kws)
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
 
+        ax.scatter(xs, ys, c=params['color'], marker='o', s=s,
+                   edgecolors='none', lw=0, alpha=alpha)
+
+        if contours is not None and contours is not False:
+            if grid is None:
+                grid = mdensity.Histogram(
+                    [(xmin, xmax), (ymin, ymax)], (kde.BINS, kde.BINS),
+                    [k('xscale') or 'linear', k('yscale') or 'linear'])
+                grid.add(xs, ys)
+                estimate = kde.KDE(grid.values(), grid.edges(), grid.logs)
+            else:
+                estimate = kde.KDE(grid.counts.reshape(grid.ny, grid.nx).T,
+                                   grid.edges(), (grid.xlog, grid.ylog))
+
+            levels = kde.LEVELS if contours is True else contours
+            self.__contours(ax, estimate, levels, True, False,
+                            key='contourcolor', **kws)
+
+        self.__stage('style')
+        self.__setscales(ax=ax, **kws)
+        self.__setlabels(ax=ax, **kws)
+        self.__style(ax)
+        self.__setarea(ax=ax, **kws)
+
+
+    @_recorded
+    def hist(self, xs, pos="111", ax=None, bins=100, weights=None,
+             density=False, fill=False, workers=None, **kws):
+        """Histogram, binned chunk by chunk
 
+        Parameters:
+        ----------
+        xs : list, np.memmap, path to a .npy file, iterator of chunks or
+             my_density.Histogram
+            Read and binned chunk by chunk, with log bins if xscale='log'.
+            The range is xmin, xmax or an extra pass over the data, which
+            iterators can't provide. A Histogram, e.g. merged from partial
+            histograms of several files or processes, is drawn as it is.
+        pos : str, optional
+        ax : Axes obj, optional
+        bins : int, optional
+        weights : same as xs, optional
+        density : bool, optional
+            Drawing a probability density instead of counts
+        fill : bool, optional
+            Filled steps instead of their outline
+        workers : int, optional
+            Binning .npy files in that many processes
+
+        Keyword Arguments
+        -----------------
+        label : str, optional
+        color : str, optional
+        xscale, yscale : str, optional
+        xmin, xmax, ymin, ymax : float, optional
+        xlabel, ylabel : str, optional
+        alpha : float
+        """
+        if ax is None: ax = self.__subplot(pos)
+
+        params = self.__getparams(**kws)
+
+        hist = self.__histogram([xs], [bins], weights, workers, **kws)
+
+        counts = hist.values().astype(np.float64)
+        edges, = hist.edges()
+        if density and counts.sum() > 0: counts /= counts.sum() * np.diff(edges)
+
+        self.__stage('draw')
+        ax.stairs(counts, edges, fill=fill, color=params['color'],
+                  linestyle=params['linestyle'], label=params['label'],
+                  alpha=params['alpha'])
+
+        self.__stage('style')
+        self.__setscales(ax=ax, **kws)
+        self.__setlabels(ax=ax, **kws)
+        self.__setarea(ax=ax, **kws)
+        self.__style(ax)
+
+
+    @_recorded
+    def hist2d(self, xs, ys=None, pos="111", ax=None, bins=100, weights=None,
+               density=False, norm=None, vmin=None, vmax=None,
+               percentiles=(1, 99), width=None, workers=None, **kws):
+        """2D histogram, binned chunk by chunk, drawn with the colormap
+
+        Parameters:
+        ----------
+        xs, ys : list, np.memmap, path to a .npy file or iterator of chunks
+            Read and binned chunk by chunk, with log bins along the axes
+            with a log scale. The range is xmin, xmax, ymin, ymax or an
+            extra pass over the data, which iterators can't provide. If ys
+            is None, xs is a my_density.Histogram, drawn as it is, or
+            yields (xs, ys) chunks.
+        pos : str, optional
+        ax : Axes obj, optional
+        bins : int or tuple of int, optional
+            Number of bins, or of (x, y) bins
+        weights : same as xs, optional
+        density : bool, optional
+            Drawing a probability density instead of counts
+        norm : str, optional
+            Color normalization of the counts, see image
+        vmin, vmax : float or None
+        percentiles : tuple of float, optional
+        width : float, optional
+        workers : int, optional
+            Binning .npy files in that many processes
+
+        Keyword Arguments
+        -----------------
+        xscale, yscale : str, optional
+        xmin, xmax, ymin, ymax : float, optional
+        xlabel, ylabel : str, optional
+        alpha : float
+        """
+        if ax is None: ax = self.__subplot(pos)
+
+        params = self.__getparams(**kws)
+
+        bins = (bins, bins) if np.isscalar(bins) else tuple(bins)
+        hist = self.__histogram([xs, ys], bins, weights, workers, **kws)
+
+        counts = hist.values().T.astype(np.float64)
+        xedges, yedges = hist.edges()
+        if density and counts.sum() > 0:
+            counts /= counts.sum() * np.outer(np.diff(yedges), np.diff(xedges))
+
+        counts[counts == 0] = np.nan
+        scaling = mnorm.norm(counts, norm or 'linear', vmin=vmin, vmax=vmax,
+                             percentiles=percentiles, width=width)
+
+        self.__stage('draw')
+        mesh = ax.pcolormesh(xedges, yedges, np.ma.masked_invalid(counts),
+                             cmap=self.compiled['cmap'], norm=scaling,
+                             alpha=params['alpha'])
+
+        if ax in self.__colorbars: self.__colorbar(ax, mesh)
+
+        self.__stage('style')
+        self.__setscales(ax=ax, **kws)
+        self.__setlabels(ax=ax, **kws)
+        self.__setarea(ax=ax, **kws)
+        self.__style(ax)
+
+
+    @_recorded
+    def density(self, xs, ys=None, pos="111", ax=None, levels=kde.LEVELS,
+                enclosed=True, bins=kde.BINS, bandwidth=None, fill=False,
+                workers=None, **kws):
+        """Density contours of points, from a Gaussian kernel density
+        estimate computed on a grid by FFT convolution
+
+        Parameters:
+        ----------
+        xs, ys : list, np.memmap, path to a .npy file or iterator of chunks
+            Binned chunk by chunk as by hist2d, with log bins along the
+            axes with a log scale. If ys is None, xs is a 2D
+            my_density.Histogram or yields (xs, ys) chunks.
+        pos : str, optional
+        ax : Axes obj, optional
+        levels : list of float or int, optional
+            Probabilities enclosed by the contours, or with enclosed=False
+            iso-density values or their number
+        enclosed : bool, optional
+        bins : int or tuple of int, optional
+            Number of bins of the grid, the cost does not depend on the
+            number of points beyond binning them
+        bandwidth : float, optional
+            Factor of the covariance of the points, default: Scott's factor
+        fill : bool, optional
+            Filled contours
+        workers : int, optional
+            Binning .npy files in that many processes
+
+        Keyword Arguments
+        -----------------
+        color : str, optional
+            Default: cycling through the primary colors, one per level
+        xscale, yscale : str, optional
+        xmin, xmax, ymin, ymax : float, optional
+        xlabel, ylabel : str, optional
+        alpha : float
+        """
+        if ax is None: ax = self.__subplot(pos)
+
+        bins = (bins, bins) if np.isscalar(bins) else tuple(bins)
+        hist = self.__histogram([xs, ys], bins, None, workers, **kws)
+        estimate = kde.KDE(hist.values(), hist.edges(), hist.logs, bandwidth)
+
+        self.__stage('draw')
+        self.__contours(ax, estimate, levels, enclosed, fill, **kws)
+
+        self.__stage('style')
+        self.__setscales(ax=ax, **kws)
+        self.__setlabels(ax=ax, **kws)
+        self.__setarea(ax=ax, **kws)
+        self.__style(ax)
+
+
+    @_recorded
     def arrow(self, xi, yi, xf, yf, pos="111", ax=None, **kws):
         """plot
 
@@ -252,22 +845,23 @@ class MyVisualization:
         alpha: float, optional
         """
 
-        if ax is None: ax = self.plt.subplot(pos)
+        if ax is None: ax = self.__subplot(pos)
 
         params = self.__getparams(**kws)
 
-        if not params['silent'] == True: _printargs("\"arrow\"", **kws)
-
+        self.__stage('draw')
         ax.arrow(xi, yi, xf - xi, yf - yi, **dict({'color': params['color']}))
 
-        self.__setscales(**kws)
-        self.__setlabels(**kws)
-        self.__setarea(**kws)
-        self.__stylespines(**kws)
-        self.__setaxiscolor(**kws)
+        self.__stage('style')
+        self.__setscales(ax=ax, **kws)
+        self.__setlabels(ax=ax, **kws)
+        self.__setarea(ax=ax, **kws)
+        self.__style(ax)
 
 
-    def plot3d(self, xs, ys, zs, pos="111", ax=None, **kws):
+    @_recorded
+    def plot3d(self, xs, ys, zs, pos="111", ax=None, reduce='auto',
+               max_points=100000, bins=None, **kws):
         """plot
 
         Parameters
@@ -276,34 +870,52 @@ class MyVisualization:
         pos : str, optional
         ax : 3DAxes obj, optional
             Axes generated by new3daxes
+        reduce : None, 'auto' or 'density', optional
+            'density' keeps only the samples where the line enters a new
+            voxel of a bins**3 grid. 'auto' does so above max_points samples.
+        max_points : int, optional
+        bins : int, optional
+            Number of voxels along each axis, default: the cube root of
+            max_points, so that the grid has about max_points voxels
 
         Keyword Arguments
         -----------------
         label : str, optional
         color : str, optional
         xscale, yscale : str, optional
-        xmin, xmax, ymin, ymax : float, optional
+        xmin, xmax, ymin, ymax, zmin, zmax : float, optional
         xlabel, ylabel : str, optional
         alpha: float, optional
         """
         if ax is None: ax = self.new3daxes(pos=pos)
 
-        params = _getparams(**kws)
-
-        if not params['silent'] == True: self.__printargs("\"plot3d\"", **kws)
+        params = self.__getparams(**kws)
 
+        if reduce == 'density' or (reduce == 'auto' and len(xs) > max_points):
+            xs, ys, zs = np.asarray(xs), np.asarray(ys), np.asarray(zs)
+            if bins is None: bins = max(int(round(max_points**(1 / 3))), 1)
+            flat = self.__grid3d(xs, ys, zs, bins, **kws).index(xs, ys, zs)
+            keep = np.r_[True, flat[1:] != flat[:-1]]
+            keep[-1] = True
+            self.__reduced("plot3d", xs.size, np.count_nonzero(keep),
+                           params['silent'])
+            xs, ys, zs = xs[keep], ys[keep], zs[keep]
+
+        self.__stage('draw')
         ax.plot(xs, ys, zs, color=params['color'],
                 linestyle=params['linestyle'], label=params['label'],
                 alpha=params['alpha'], lw=params['linewidth'])
 
-        self.__setscales(**kws)
-        self.__setlabels(**kws)
-        self.__setarea(**kws)
-        self.__stylespines(**kws)
-        self.__setaxiscolor(**kws)
+        self.__stage('style')
+        self.__setscales(ax=ax, **kws)
+        self.__setlabels(ax=ax, **kws)
+        self.__setarea(ax=ax, **kws)
+        self.__style(ax)
 
 
-    def scatter3d(self, xs, ys, zs, pos='111', ax=None, s=10, **kws):
+    @_recorded
+    def scatter3d(self, xs, ys, zs, pos='111', ax=None, s=10, reduce='auto',
+                  max_points=10000, bins=64, **kws):
         """Scatter3d plot
 
         Parameters:
@@ -312,6 +924,14 @@ class MyVisualization:
         pos : str, optional
         axes : plt.Axes3D obj, optional
         s : int, optional
+        reduce : None, 'auto' or 'density', optional
+            'density' bins the points into a bins**3 voxel grid and draws
+            one marker per occupied voxel, colored by its number of points,
+            at most max_points of the most populated ones. 'auto' does so
+            above max_points points.
+        max_points : int, optional
+        bins : int, optional
+            Number of voxels along each axis
 
         Keyword Arguments
         ----------------
@@ -323,17 +943,30 @@ class MyVisualization:
         """
         k = kws.get
 
-        if ax is None:
-            ax = self.plt.gcf().add_subplot(pos, projection='3d')
+        if ax is None: ax = self.new3daxes(pos=pos)
 
         params = self.__getparams(**kws)
-        if not params['silent'] == True: _printargs("\"scatter3d\"", **kws)
 
         alpha = k('alpha') if 'alpha' in kws else None
 
-        ax.scatter(xs, ys, zs, c=params['color'], marker='o', s=s,
-                   edgecolors='none', lw=0, alpha=alpha)
-
+        if reduce == 'density' or (reduce == 'auto' and len(xs) > max_points):
+            grid = self.__grid3d(xs, ys, zs, bins, **kws)
+            grid.add(xs, ys, zs)
+            xs, ys, zs, counts = grid.densest(max_points)
+            self.__reduced("scatter3d", grid.counts.sum(), counts.size,
+                           params['silent'])
+
+            self.__stage('draw')
+            norm = mcolors.LogNorm(vmin=1, vmax=max(counts.max(), 2))
+            ax.scatter(xs, ys, zs, c=counts, cmap=self.compiled['cmap'],
+                       norm=norm, marker='o', s=s, edgecolors='none', lw=0,
+                       alpha=alpha)
+        else:
+            self.__stage('draw')
+            ax.scatter(xs, ys, zs, c=params['color'], marker='o', s=s,
+                       edgecolors='none', lw=0, alpha=alpha)
+
+        self.__stage('style')
         if 'xlabel' in kws: ax.set_xlabel(k('xlabel'))
         if 'ylabel' in kws: ax.set_ylabel(k('ylabel'))
         if 'zlabel' in kws: ax.set_zlabel(k('zlabel'))
@@ -342,10 +975,184 @@ class MyVisualization:
         if 'ymin' in kws and 'ymax' in kws: ax.set_ylim(k('ymin'), k('ymax'))
         if 'zmin' in kws and 'zmax' in kws: ax.set_zlim(k('zmin'), k('zmax'))
 
-        self._setscales(**kws)
-        self._setaxiscolor3d(**kws)
+        self.__setscales(ax=ax, **kws)
+        self.__style(ax)
+
 
+    @_profiled
+    def liveplot(self, capacity, pos="111", ax=None, max_points=None, **kws):
+        """Live plot, updated by appending samples to the returned series
 
+        Parameters
+        ----------
+        capacity : int
+            Number of last samples kept in the series ring buffer
+        pos : str, optional
+        ax : Axes obj, optional
+        max_points : int, optional
+            Lines longer than this are drawn as their min/max envelope,
+            default: twice the width of the axes in pixels
+
+        Keyword Arguments
+        -----------------
+        Same as plot. If any of xmin, xmax, ymin, ymax is given, the limits
+        of the axes are not grown with the data.
+
+        Returns
+        -------
+        series : my_live.Line
+            series.append(xs, ys) adds samples, shown on the next refresh()
+        """
+        if ax is None: ax = self.__subplot(pos)
+
+        params = self.__getparams(**kws)
+        if self.calls is not None: self.calls.valid = False
+
+        self.__stage('draw')
+        line, = ax.plot([], [], color=params['color'],
+                        linestyle=params['linestyle'], label=params['label'],
+                        alpha=params['alpha'])
+
+        self.__stage('style')
+        self.__setscales(ax=ax, **kws)
+        self.__setlabels(ax=ax, **kws)
+        self.__setarea(ax=ax, **kws)
+        self.__style(ax)
+
+        if max_points is None: max_points = 2 * self.__pixels(ax)[0]
+
+        return self.__livefigure().add(live.Line(line, ax, capacity, max_points,
+                                                 autoscale=not self.__haslimits(kws)))
+
+
+    @_profiled
+    def livescatter(self, capacity, pos="111", ax=None, s=10, reduce='auto',
+                    max_points=5000, **kws):
+        """Live scatter plot, updated by appending samples to the returned series
+
+        Parameters
+        ----------
+        capacity : int
+            Number of last samples kept in the series ring buffer
+        pos : str, optional
+        ax : Axes obj, optional
+        s : int, optional
+        reduce : None, 'auto' or 'density', optional
+            'auto' draws buffers of more than max_points samples as a
+            pixel-resolution density image, whose counts are updated with
+            the appended samples only. None strides them down to max_points
+            markers, 'density' always draws the image.
+        max_points : int, optional
+            Maximum number of markers drawn
+
+        Keyword Arguments
+        -----------------
+        Same as scatter. If any of xmin, xmax, ymin, ymax is given, the
+        limits of the axes are not grown with the data.
+
+        Returns
+        -------
+        series : my_live.Scatter
+            series.append(xs, ys) adds samples, shown on the next refresh()
+        """
+        if ax is None: ax = self.__subplot(pos)
+
+        params = self.__getparams(**kws)
+        if self.calls is not None: self.calls.valid = False
+
+        self.__stage('draw')
+        points = ax.scatter([], [], c=params['color'], marker='o', s=s,
+                            edgecolors='none', lw=0, alpha=params['alpha'])
+
+        image = None
+        if reduce is not None:
+            image = ax.imshow(np.ma.masked_all((1, 1)), cmap=self.compiled['cmap'],
+                              norm=mcolors.LogNorm(vmin=1, vmax=2), origin='lower',
+                              aspect='auto', interpolation='nearest',
+                              alpha=params['alpha'], visible=False)
+        if reduce == 'density': max_points = 0
+
+        self.__stage('style')
+        self.__setscales(ax=ax, **kws)
+        self.__setlabels(ax=ax, **kws)
+        self.__setarea(ax=ax, **kws)
+        self.__style(ax)
+
+        return self.__livefigure().add(live.Scatter(points, ax, capacity, max_points,
+                                                    autoscale=not self.__haslimits(kws),
+                                                    image=image))
+
+
+    @_profiled
+    def refresh(self):
+        """Redrawing the live series which received new samples
+
+        Only the changed series are drawn over a cached background (blitting)
+        unless their data left the limits of the axes.
+        """
+        self.__stage('draw')
+        if self.__live is not None: self.__live.refresh()
+
+
+    def animation(self, dpi=None):
+        """Frame sequence reusing this figure
+
+        Its plot, scatter and image methods draw the series of the first
+        frame and return handles, frames then only swap their data.
+
+        Parameters
+        ----------
+        dpi : int, optional
+            Default: dpi of the figure
+
+        Returns
+        -------
+        animation : my_animate.Animation
+        """
+        return animate.Animation(self, dpi)
+
+
+    @_recorded
+    def layout(self, nrows, ncols, names=None, sharex=False, sharey=False,
+               wspace=None, hspace=None, colorbars=False):
+        """Creating a whole grid of 2d axes at once
+
+        The axes are indexed by (row, column), by their subplot number
+        (1 to nrows * ncols, row by row) and by their name, so the pos of
+        every drawing method can be any of these, without searching or
+        recreating axes.
+
+        Parameters
+        ----------
+        nrows, ncols : int
+        names : list of str, optional
+            Names of the axes, row by row
+        sharex, sharey : bool or str, optional
+            As in matplotlib.pyplot.subplots: True, False, 'row' or 'col'
+        wspace, hspace : float, optional
+            Spacing between the axes, as a fraction of their width/height
+        colorbars : bool, optional
+            Adding a colorbar next to the images drawn in the axes
+
+        Returns
+        -------
+        axes : (nrows, ncols) array of Axes
+        """
+        axes = self.fig.subplots(nrows, ncols, sharex=sharex, sharey=sharey,
+                                 squeeze=False,
+                                 gridspec_kw={'wspace': wspace, 'hspace': hspace})
+
+        names = list(names or [])
+        for i, ax in enumerate(axes.flat):
+            r, c = divmod(i, ncols)
+            self.__axes[(r, c)] = self.__axes[i + 1] = ax
+            if i < len(names): self.__axes[names[i]] = ax
+            if colorbars: self.__colorbars[ax] = None
+
+        return axes
+
+
+    @_recorded
     def new2daxes(self, pos='111', sharex=None, sharey=None):
         """Creatign new 2d axes for plotting
 
@@ -356,9 +1163,14 @@ class MyVisualization:
         sharex, sharey : Axes, optional
             Sharing axes with other plots
         """
-        return self.plt.gcf().add_subplot(pos, sharex=sharex, sharey=sharey)
+        ax = self.fig.add_subplot(*self.__position(pos), sharex=sharex,
+                                  sharey=sharey)
+        self.__axes[pos] = ax
+
+        return ax
 
 
+    @_recorded
     def new3daxes(self, pos='111'):
         """Creatign new 3d axes for plotting
 
@@ -367,13 +1179,22 @@ class MyVisualization:
         pos : str, optional
             Position of the subplot inside the figure
         """
-        return self.plt.gcf().add_subplot(pos, projection='3d')
+        import mpl_toolkits.mplot3d  # registering the '3d' projection
+
+        ax = self.fig.add_subplot(*self.__position(pos), projection='3d')
+        self.__axes[pos] = ax
+
+        return ax
 
 
+    @_recorded
     def coaxis(self, ticksloc, ticklabels, label, ax=None,
                axis='x', scale='linear', showminorticks=True, **kws):
         """Creating a new twin x axis at the top of the plot
 
+        The twin is created once per axes and axis, and reused by later
+        calls.
+
         Parameters
         ----------
         pos : list of numbers
@@ -388,10 +1209,18 @@ class MyVisualization:
         showminorticks : bool
         colorscheme : string, optional
             The name of colorscheme from mycolordict module
+
+        Returns
+        -------
+        twinax : Axes
         """
-        if ax is None: ax = self.plt.gca()
+        if ax is None: ax = self.fig.gca()
 
-        twinax = ax.twiny() if axis is 'x' else ax.twinx()
+        self.__stage('draw')
+        twinax = self.__twins.get((ax, axis))
+        if twinax is None:
+            twinax = ax.twiny() if axis is 'x' else ax.twinx()
+            self.__twins[(ax, axis)] = twinax
 
         set_scale = twinax.set_xscale if axis is 'x' else twinax.set_yscale
         set_label = twinax.set_xlabel if axis is 'x' else twinax.set_ylabel
@@ -419,13 +1248,17 @@ class MyVisualization:
         twinax.spines['top'].set_color(self.cscheme['axiscolor'])
         twinax.spines['right'].set_color(self.cscheme['axiscolor'])
 
-        self.__setaxiscolor(ax=ax, **kws)
-        self.__setaxiscolor(ax=twinax, **kws)
+        self.__stage('style')
+        self.__style(ax)
+        self.__style(twinax)
+
+        return twinax
 
 
+    @_recorded
     def setgrid(self, ax=None, **kws):
         """Setting plot grid and background"""
-        if ax is None: ax = self.plt.gca()
+        if ax is None: ax = self.fig.gca()
 
         ax.set_axis_bgcolor(self.cscheme['background'])
         ax.grid(color=self.cscheme['gridcolor'],
@@ -435,9 +1268,82 @@ class MyVisualization:
         ax.set_axisbelow(True)
 
 
+    @_profiled
+    def render(self, plan, data=None):
+        """Drawing a figure spec
+
+        Rendering a plan of the same layout (axes, styling and coaxes) as
+        the plan drawn last reuses its axes and their twins: only their
+        series, legends and limits are redone. Otherwise, the axes of the
+        previous plan are removed.
+
+        Parameters
+        ----------
+        plan : my_spec.Plan, or a spec to compile, see my_spec.Plan
+            Compile specs drawn repeatedly once, with my_spec.Plan(spec)
+        data : dict, optional
+            Arrays referenced by the series of the plan
+
+        Returns
+        -------
+        axes : dict
+            Axes of the plan by pos
+        """
+        if not isinstance(plan, mspec.Plan): plan = mspec.Plan(plan)
+
+        if self.__rendered is not None and self.__rendered[0] == plan.layout:
+            axes = self.__rendered[1]
+            for ax in axes.values(): self.__clearseries(ax)
+        else:
+            if self.__rendered is not None:
+                for ax in self.__rendered[1].values(): self.__removeaxes(ax)
+
+            axes = {}
+            for entry in plan.axes:
+                pos = entry['pos']
+                if entry['projection'] == '3d':
+                    axes[pos] = self.new3daxes(pos=pos)
+                else:
+                    axes[pos] = self.new2daxes(pos=pos,
+                                               sharex=axes.get(entry['sharex']),
+                                               sharey=axes.get(entry['sharey']))
+            self.__rendered = plan.layout, axes
+
+        # Series still reduce their data with the axes keyword arguments,
+        # but the axes are styled once, below. Their parameters are resolved
+        # once per plan, instead of by every call.
+        self.__planned.update(axes.values())
+        self.__stage('draw')
+        try:
+            for entry, params in zip(plan.axes, plan.params(self.defaults)):
+                ax = axes[entry['pos']]
+                for (kind, refs, kws), resolved in zip(entry['series'], params):
+                    self.__resolved = resolved
+                    getattr(self, kind)(*plan.bind(refs, data), ax=ax, **kws)
+        finally:
+            self.__planned.clear()
+            self.__resolved = None
+
+        self.__stage('style')
+        for entry in plan.axes:
+            ax, style = axes[entry['pos']], entry['style']
+            self.__setscales(ax=ax, **style)
+            self.__setlabels(ax=ax, **style)
+            self.__setarea(ax=ax, **style)
+            if 'zlabel' in style: ax.set_zlabel(style['zlabel'])
+            if 'zmin' in style or 'zmax' in style:
+                ax.set_zlim(style.get('zmin'), style.get('zmax'))
+            self.__style(ax)
+
+            for coaxis in entry['coaxes']: self.coaxis(ax=ax, **coaxis)
+            if entry['legend'] is not None: self.legend(ax=ax, **entry['legend'])
+
+        return axes
+
+
+    @_recorded
     def legend(self, pos="111", ax=None, loc="upper right",
-               fontsize='medium', framealpha=0.7, frameon=False,
-               bgcolor=cdict.get('RAINBOW')['gridcolor']):
+               fontsize='medium', framealpha=0.7, frameon=False, bgcolor=None):
         """Add legend to plot
 
         Parameters
@@ -452,33 +1358,281 @@ class MyVisualization:
             Font size of the legend
         framealpha : None or bool, optional
         bgcolor : str, optional
-            Background color of the legend
+            Background color of the legend, default: gridcolor of the
+            color scheme
         """
-        if ax is None: ax = self.plt.subplot(pos)
+        if ax is None: ax = self.__subplot(pos)
+        if bgcolor is None: bgcolor = self.cscheme['gridcolor']
 
+        self.__stage('draw')
         ax.legend(loc=loc, fontsize=fontsize, frameon=None,
                   framealpha=framealpha, facecolor=bgcolor)
 
 
-    def save(self, name, dpi=360, transparent=True):
+    @_profiled
+    def save(self, name, dpi=360, transparent=True, background=False,
+             rasterize=export.RASTERIZE):
         """Saving plot
 
+        The tight bounding box of the figure is computed once, from a pass
+        laying it out without rendering it. Raster outputs (png, jpg, tif,
+        webp) are then encoded from a single rendering of that bounding box
+        at dpi, the pixels savefig would write. Vector outputs are drawn by
+        their own backend, with the same bounding box. In them, data layers
+        (lines, markers, meshes) drawing more than rasterize vertices are
+        rasterized at dpi, except in 3D axes, while axes, ticks, labels and
+        legends stay vectors. The decisions are kept in self.rasterized.
+
         Parameters
         ----------
-        name : str
-            name and extension of the plot
+        name : str, file-like object or list of them
+            name and extension of the plot, or several names to export
+            several formats
         dpi : integer
             dots per inch
         transparent : bool
             Transparet background
+        background : bool or concurrent.futures.Executor, optional
+            Encoding and writing raster outputs in a shared thread pool, or
+            in the given executor, and returning a future
+        rasterize : int or None, optional
+            Number of vertices above which a layer is rasterized in vector
+            outputs, None to write every layer as vectors
+
+        Returns
+        -------
+        hit : bool, list of bool or Future of them
+            Whether the file was copied from the cache instead of rendered,
+            for each name if a list is given
         """
-        self.plt.savefig(name, dpi=dpi, bbox_inches='tight',
-                         transparent=transparent)
+        names = list(name) if isinstance(name, (list, tuple)) else [name]
+
+        hits, keys = [], []
+        for n in names:
+            key = None
+            if self.cache is not None and self.calls.valid and isinstance(n, str):
+                key = self.calls.hexdigest('save', dpi, transparent, rasterize,
+                                           os.path.splitext(n)[1])
+            hits.append(key is not None and self.cache.fetch(key, n))
+            keys.append(key)
+
+        self.__stage('save')
+        jobs = self.__export([(n, key) for n, key, hit in zip(names, keys, hits)
+                              if not hit], dpi, transparent, rasterize)
+
+        result = hits if isinstance(name, (list, tuple)) else hits[0]
+        if background is False: return export.run(jobs, result)
+
+        pool = background if background is not True else export.executor()
+        return pool.submit(export.run, jobs, result)
+
+
+    @_profiled
+    def rgba(self, dpi=None, transparent=False, tight=False):
+        """Rendering the figure into its Agg canvas, without saving it
+
+        Parameters
+        ----------
+        dpi : int, optional
+            Default: dpi of the figure
+        transparent : bool, optional
+        tight : bool, optional
+            Rendering the tight bounding box only, as save does
+
+        Returns
+        -------
+        rgba : (height, width, 4) array of uint8
+            With tight, the pixels save writes. Otherwise a view of the
+            canvas buffer, not a copy, so only valid until the figure is
+            drawn again.
+        """
+        self.__stage('draw')
+        dpi = self.fig.dpi if dpi is None else dpi
+        if tight: return self.__raster(dpi, transparent, self.__tight(dpi))
+
+        if not hasattr(self.fig.canvas, 'buffer_rgba'):
+            raise TypeError('The canvas has no RGBA buffer, use pyplot=False '
+                            'or the Agg backend')
+
+        return self.__draw(dpi, transparent)
+
+
+    @_profiled
+    def encode(self, format='png', dpi=360, transparent=True, level=6,
+               quality=None, out=None):
+        """Rendering the figure in memory and encoding it, without any file
+
+        Parameters
+        ----------
+        format : str, optional
+            'png', 'webp', 'jpg' or 'tif'
+        dpi : int, optional
+        transparent : bool, optional
+        level : int, optional
+            PNG compression level, from 0 (fastest) to 9 (smallest)
+        quality : int, optional
+            JPEG and lossy WebP quality, from 0 to 100. WebP is lossless
+            if None.
+        out : file-like object, optional
+            Where to write the encoded image, instead of returning bytes
+
+        Returns
+        -------
+        image : bytes, or out
+        """
+        rgba = self.rgba(dpi, transparent, tight=True)
+
+        self.__stage('save')
+        target = io.BytesIO() if out is None else out
+        export.write(rgba, target, dpi, format=format, level=level,
+                     quality=quality)
+
+        return target.getvalue() if out is None else out
+
+
+    def __export(self, outputs, dpi, transparent, rasterize):
+        """Rendering the raster outputs once, return their writes, and
+        saving the vector ones, all within one tight bounding box"""
+        if not outputs: return []
+
+        if not hasattr(self.fig.canvas, 'get_renderer'):
+            self.__vectors(outputs, dpi, transparent, rasterize, 'tight')
+            return []
+
+        bbox = self.__tight(dpi)
+        rasters = [(n, key) for n, key in outputs if export.fmt(n) in export.RASTER]
+        vectors = [(n, key) for n, key in outputs if export.fmt(n) not in export.RASTER]
+
+        jobs = []
+        if rasters:
+            rgba = self.__raster(dpi, transparent, bbox)
+            jobs = [functools.partial(export.write, rgba, name, dpi, self.cache, key)
+                    for name, key in rasters]
+
+        self.__vectors(vectors, dpi, transparent, rasterize, bbox)
+        return jobs
+
+
+    def __vectors(self, outputs, dpi, transparent, rasterize, bbox):
+        """Saving outputs with savefig, heavy layers rasterized in the
+        vector ones"""
+        if not outputs: return
+
+        layers = export.layers(self.fig, np.inf if rasterize is None else rasterize)
+        changed = [a for a, layer in layers
+                   if layer['rasterized'] and not a.get_rasterized()]
+        self.rasterized = [layer for _, layer in layers]
+
+        for layer in self.rasterized:
+            mprofile.logger.debug('Layer %s "%s" of axes %d, %d vertices, %s',
+                                  layer['layer'], layer['label'], layer['axes'],
+                                  layer['vertices'], 'rasterized' if
+                                  layer['rasterized'] else 'vector')
+
+        if self.__live is not None: self.__live.static(True)
+        try:
+            for name, key in outputs:
+                vector = export.fmt(name) not in export.RASTER
+                for a in changed: a.set_rasterized(vector)
+                self.fig.savefig(name, dpi=dpi, bbox_inches=bbox,
+                                 transparent=transparent)
+                if key is not None: self.cache.store(key, name)
+        finally:
+            for a in changed: a.set_rasterized(False)
+            if self.__live is not None: self.__live.static(False)
+
+
+    def __draw(self, dpi, transparent):
+        """Drawing the whole canvas at dpi, return a view of its RGBA buffer"""
+        fig, canvas = self.fig, self.fig.canvas
+        patches = [fig.patch] + [ax.patch for ax in fig.axes]
+        colors = [(p.get_facecolor(), p.get_edgecolor()) for p in patches]
+        olddpi = fig.dpi
+
+        if self.__live is not None: self.__live.static(True)
+        try:
+            if transparent:
+                for p in patches:
+                    p.set_facecolor('none')
+                    p.set_edgecolor('none')
+
+            fig.dpi = dpi
+            canvas.draw()
+            buffer = np.asarray(canvas.buffer_rgba())
+        finally:
+            fig.dpi = olddpi
+            for p, (face, edge) in zip(patches, colors):
+                p.set_facecolor(face)
+                p.set_edgecolor(edge)
+            if self.__live is not None: self.__live.static(False)
+
+        return buffer
+
+
+    def __tight(self, dpi):
+        """Tight bounding box of the figure at dpi in inches, padded as by
+        savefig, from a pass laying the figure out without rendering it"""
+        fig, olddpi = self.fig, self.fig.dpi
+        try:
+            fig.dpi = dpi
+            fig.draw_without_rendering()
+            bbox = fig.get_tightbbox()
+        finally:
+            fig.dpi = olddpi
+
+        return bbox.padded(matplotlib.rcParams['savefig.pad_inches'])
+
+
+    def __raster(self, dpi, transparent, bbox):
+        """Rendering the figure once within bbox, as savefig does, return
+        its (height, width, 4) pixels"""
+        buffer = io.BytesIO()
+        if self.__live is not None: self.__live.static(True)
+        try:
+            self.fig.savefig(buffer, format='rgba', dpi=dpi, bbox_inches=bbox,
+                             transparent=transparent)
+        finally:
+            if self.__live is not None: self.__live.static(False)
+
+        shape = int(bbox.height * dpi), int(bbox.width * dpi), 4
+        return np.frombuffer(buffer.getbuffer(), dtype=np.uint8).reshape(shape)
+
+
+    def __removeaxes(self, ax):
+        """Removing an axes from the figure, with its twins and colorbar"""
+        for key in [k for k in self.__twins if k[0] is ax]:
+            self.__twins.pop(key).remove()
+
+        cax = self.__colorbars.pop(ax, None)
+        if cax is not None: cax.remove()
+
+        for key in [k for k, a in self.__axes.items() if a is ax]:
+            del self.__axes[key]
+
+        ax.remove()
+
+
+    @staticmethod
+    def __clearseries(ax):
+        """Removing the series and the legend of an axes, and resetting its
+        scales and limits as in a new axes, keeping its styling"""
+        for a in [*ax.lines, *ax.collections, *ax.images, *ax.patches, *ax.texts]:
+            a.remove()
+        if ax.get_legend() is not None: ax.get_legend().remove()
+
+        axes = 'xyz' if hasattr(ax, 'zaxis') else 'xy'
+        for axis in axes:
+            getattr(ax, 'set_{}scale'.format(axis))('linear')
+            getattr(ax, 'set_{}lim'.format(axis))(0, 1)
+
+        ax.relim()
+        ax.set_autoscale_on(True)
 
 
     def __setscales(self, ax=None, **kws):
         """Setting plot scale parameters if available"""
-        if ax is None: ax = self.plt.gca()
+        if ax is None: ax = self.fig.gca()
+        if ax in self.__planned: return
 
         if 'xscale' in kws: ax.set_xscale(kws.get('xscale'))
         if 'yscale' in kws: ax.set_yscale(kws.get('yscale'))
@@ -487,7 +1641,8 @@ class MyVisualization:
 
     def __setlabels(self, ax=None, **kws):
         """Setting plot labels parameters if available"""
-        if ax is None: ax = self.plt.gca()
+        if ax is None: ax = self.fig.gca()
+        if ax in self.__planned: return
 
         if 'xlabel' in kws: ax.set_xlabel(kws.get('xlabel'))
         if 'ylabel' in kws: ax.set_ylabel(kws.get('ylabel'))
@@ -496,75 +1651,286 @@ class MyVisualization:
 
     def __setarea(self, ax=None, **kws):
         """Setting plot area if available"""
-        if ax is None: ax = self.plt.gca()
+        if ax is None: ax = self.fig.gca()
+        if ax in self.__planned: return
 
         if 'xmin' in kws: ax.set_xlim(left=kws.get('xmin'))
         if 'xmax' in kws: ax.set_xlim(right=kws.get('xmax'))
         if 'ymin' in kws: ax.set_ylim(bottom=kws.get('ymin'))
         if 'ymax' in kws: ax.set_ylim(top=kws.get('ymax'))
 
-    def __stylespines(self, ax=None, **kws):
-        """Removing plot top and right spines"""
-        if ax is None: ax = self.plt.gca()
-
-        ax.spines['top'].set_color(self.cscheme['axiscolor'])
-        ax.spines['left'].set_color(self.cscheme['axiscolor'])
-        ax.spines['right'].set_color(self.cscheme['axiscolor'])
-        ax.spines['bottom'].set_color(self.cscheme['axiscolor'])
-
-
-    def __setaxiscolor(self, ax=None, **kws):
-        """Setting plot axis color if available"""
-        if ax is None: ax = self.plt.gca()
-
-        ax.xaxis.label.set_color(self.cscheme['axiscolor'])
-        ax.tick_params(axis='x', colors=self.cscheme['axiscolor'])
-        for tick in ax.xaxis.get_major_ticks():
-            tick.label.set_color(self.cscheme['axiscolor'])
-            tick.label.set_fontsize(self.tickfontsize)
-        for label in ax.xaxis.get_majorticklabels():
-            label.set_color(self.cscheme['axiscolor'])
-            label.set_fontsize(self.tickfontsize)
-        ax.xaxis.label.set_fontsize(self.labelfontsize)
-
-        ax.yaxis.label.set_color(self.cscheme['axiscolor'])
-        ax.tick_params(axis='y', colors=self.cscheme['axiscolor'])
-        for tick in ax.yaxis.get_major_ticks():
-            tick.label.set_color(self.cscheme['axiscolor'])
-            tick.label.set_fontsize(self.tickfontsize)
-        for label in ax.yaxis.get_majorticklabels():
-            label.set_color(self.cscheme['axiscolor'])
-            label.set_fontsize(self.tickfontsize)
-        ax.yaxis.label.set_fontsize(self.labelfontsize)
-
-
-    def __setaxiscolor3d(self, ax=None, **kws):
-        """Setting plot axis color if available"""
-        if ax is None: ax = self.plt.gca()
-
-        self.__setaxiscolor(ax=ax, **kws)
-
-        ax.zaxis.label.set_color(self.cscheme['axiscolor'])
-        ax.tick_params(axis='z', colors=self.cscheme['axiscolor'])
-        for tick in ax.zaxis.get_major_ticks():
-            tick.label.set_fontsize(self.tickfontsize)
-        for label in ax.zaxis.get_majorticklabels():
-            label.set_color(self.cscheme['axiscolor'])
-            label.set_fontsize(self.tickfontsize)
-        ax.zaxis.label.set_fontsize(self.labelfontsize)
-
-
-    def __printargs(self, title, **kws):
-        """Printing used keyword arguments for a specific plot"""
-        if len(dict(kws).keys()) > 0:
-            print(str(title) + ' is plotting using following parameters:')
-            for key, value in dict(kws).items():
-                print('\t {:15s}'.format(str(key)) + str(value))
-                print('')
+
+    def __style(self, ax):
+        """Coloring spines, ticks and labels of an axes, once per axes
+
+        tick_params also applies to the ticks matplotlib creates later, so
+        adding more layers to a styled axes doesn't need restyling.
+        """
+        if ax in self.__styled: return
+        self.__styled.add(ax)
+
+        color = self.cscheme['axiscolor']
+        axes = [ax.xaxis, ax.yaxis] + ([ax.zaxis] if hasattr(ax, 'zaxis') else [])
+
+        for spine in ax.spines.values(): spine.set_color(color)
+
+        for axis in axes:
+            axis.set_tick_params(colors=color, labelsize=self.tickfontsize)
+            axis.label.set_color(color)
+            axis.label.set_fontsize(self.labelfontsize)
+
+
+    def __livefigure(self):
+        if self.__live is None: self.__live = live.Live(self.fig)
+        return self.__live
+
+
+    @staticmethod
+    def __haslimits(kws):
+        return any(key in kws for key in ('xmin', 'xmax', 'ymin', 'ymax'))
+
+
+    def __colorbar(self, ax, mappable):
+        """Drawing the colorbar of mappable next to ax, in a reused axes"""
+        cax = self.__colorbars[ax]
+        if cax is None:
+            from mpl_toolkits.axes_grid1 import make_axes_locatable
+            cax = make_axes_locatable(ax).append_axes('right', size='5%', pad=0.05)
+            self.__colorbars[ax] = cax
+        else:
+            cax.clear()
+
+        self.fig.colorbar(mappable, cax=cax)
+        self.__style(cax)
+
+
+    def __subplot(self, pos):
+        """Return the axes at pos, creating it on first use"""
+        ax = self.__axes.get(pos)
+        if ax is None:
+            ax = self.__axes[pos] = self.fig.add_subplot(*self.__position(pos))
+
+        self.fig.sca(ax)
+        return ax
+
+
+    @staticmethod
+    def __position(pos):
+        """add_subplot arguments of pos, '121' strings being split into
+        numbers, which recent matplotlib requires"""
+        if isinstance(pos, str) and len(pos) == 3 and pos.isdigit():
+            return tuple(map(int, pos))
+
+        return pos if isinstance(pos, tuple) and len(pos) == 3 else (pos,)
+
+
+    @staticmethod
+    def __histogram(sources, bins, weights=None, workers=None, **kws):
+        """Histogram of sources, binned with the scales and limits of kws,
+        the missing limits read from the sources first. Sources may also be
+        a pair iterator followed by None, or a Histogram."""
+        if isinstance(sources[0], mdensity.Histogram): return sources[0]
+
+        pairs = sources[-1] is None
+        lims, scales = [], []
+        for source, axis in zip(sources, 'xy'):
+            scale = kws.get(axis + 'scale') or 'linear'
+            lo, hi = kws.get(axis + 'min'), kws.get(axis + 'max')
+            if lo is None or hi is None:
+                if pairs:
+                    raise ValueError('{0}min and {0}max are needed to bin '
+                                     'chunks of pairs'.format(axis))
+                found = stream.limits(source, log=scale == 'log')
+                lo, hi = found[0] if lo is None else lo, found[1] if hi is None else hi
+
+            lims.append((lo, hi))
+            scales.append(scale)
+
+        hist = mdensity.Histogram(lims, bins, scales)
+        if pairs:
+            for x, y in stream.chunks(sources[0]): hist.add(x, y)
+            return hist
+
+        return hist.fill(*sources, weights=weights, workers=workers)
+
+
+    @staticmethod
+    def __crop(shape, **kws):
+        """Rows and columns of an image inside xmin, xmax, ymin, ymax"""
+        k = kws.get
+        if not any(key in kws for key in ('xmin', 'xmax', 'ymin', 'ymax')):
+            return None
+
+        nr, nc = shape[:2]
+        xs = sorted([k('xmin', -0.5), k('xmax', nc - 0.5)])
+        ys = sorted([k('ymin', nr - 0.5), k('ymax', -0.5)])
+
+        clip = lambda v, n: int(min(max(v, 0), n))
+        return (clip(np.floor(ys[0] + 0.5), nr), clip(np.ceil(ys[1] + 0.5), nr),
+                clip(np.floor(xs[0] + 0.5), nc), clip(np.ceil(xs[1] + 0.5), nc))
+
+
+    @staticmethod
+    def __grid3d(xs, ys, zs, bins, **kws):
+        """Empty my_density.Grid3D over the limits in kws or of the points"""
+        k = kws.get
+        lims = [(k(a + 'min') if a + 'min' in kws else np.nanmin(v),
+                 k(a + 'max') if a + 'max' in kws else np.nanmax(v))
+                for a, v in zip('xyz', (xs, ys, zs))]
+
+        return mdensity.Grid3D(*lims, (bins, bins, bins))
+
+
+    def __stage(self, name):
+        """Moving the current call to a new profiler stage"""
+        if self.profiler is not None: self.profiler.stage(name)
+
+
+    def __pixels(self, ax):
+        """Size of the axes in output pixels, (width, height)"""
+        w, h = ax.get_position().size * self.fig.get_size_inches()
+        return max(int(w * self.dpi), 1), max(int(h * self.dpi), 1)
+
+
+    def __shade(self, ax, xs, ys, yerrs, params, reduce=None, **kws):
+        """Shading stacked bands of multiples of the y errors
+
+        The widest band is drawn first, so with the default alpha of
+        1 / number of bands, inner bands get darker. Bands are built in two
+        reused buffers, and reduced to their own min/max envelopes if reduce
+        is set.
+        """
+        k = kws.get
+
+        xs = np.asarray(xs)
+        ys = np.asarray(ys, dtype=np.float64)
+        errs = np.asarray(yerrs, dtype=np.float64)
+        lower, upper = (errs[0], errs[1]) if errs.ndim == 2 else (errs, errs)
+
+        sigmas = sorted(k('shadedsigmas') or [1], reverse=True)
+        c = k('shadedcolor') if 'shadedcolor' in kws else params['shadow']
+        alpha = k('shadedalpha') if 'shadedalpha' in kws else 1.0 / len(sigmas)
+
+        ylow, yhigh = np.empty_like(ys), np.empty_like(ys)
+
+        for sigma in sigmas:
+            np.subtract(ys, np.multiply(lower, sigma, out=ylow), out=ylow)
+            np.add(ys, np.multiply(upper, sigma, out=yhigh), out=yhigh)
+
+            if reduce in ('auto', 'minmax'):
+                i = np.union1d(self.__minmax(ax, xs, ylow, **kws),
+                               self.__minmax(ax, xs, yhigh, **kws))
+                x, low, high = xs[i], ylow[i], yhigh[i]
+            else:
+                x, low, high = xs, ylow, yhigh
+
+            ax.fill_between(x, low, high, facecolor=c, edgecolor=c, alpha=alpha)
+
+
+    @staticmethod
+    def __series(xs, ys):
+        """List of (xs, ys) arrays of many lines"""
+        if ys is None: xs, ys = None, xs
+        ys = [np.asarray(y, dtype=np.float64) for y in ys]
+
+        if xs is None:
+            xs = [np.arange(y.size) for y in ys]
+        elif len(xs) > 0 and np.ndim(xs[0]) == 0:
+            xs = [np.asarray(xs)] * len(ys)
+
+        return [(np.asarray(x), y) for x, y in zip(xs, ys)]
+
+
+    @staticmethod
+    def __errors(errs):
+        """(lower, upper) of symmetric or asymmetric errors"""
+        return (errs[0], errs[1]) if errs.ndim == 2 else (errs, errs)
+
+
+    def __reducemany(self, title, ax, lines, reduce, params, **kws):
+        """Reducing every line, and its errors, to its min/max envelope"""
+        if reduce not in ('auto', 'minmax'): return lines
+
+        reduced, points, drawn = [], 0, 0
+        for line in lines:
+            x, y = line[:2]
+            i = self.__minmax(ax, x, y, **kws)
+            points, drawn = points + y.size, drawn + i.size
+
+            if len(line) == 2: reduced.append((x[i], y[i]))
+            else: reduced.append((x[i], y[i], tuple(e[i] for e in line[2])))
+
+        self.__reduced(title, points, drawn, params['silent'])
+        return reduced
+
+
+    def __contours(self, ax, estimate, levels, enclosed, fill, key='color',
+                   **kws):
+        """Drawing the iso-density contours of a my_kde.KDE, cycling
+        through the primary colors"""
+        top = estimate.values.max()
+        if enclosed: levels = estimate.levels(levels)
+        elif np.isscalar(levels): levels = np.linspace(0, top, levels + 2)[1:-1]
+
+        colors = self.__colors(len(levels), 'primary_colors', key=key, **kws)
+        if fill: levels = np.append(levels, max(top, levels[-1]))
+
+        draw = ax.contourf if fill else ax.contour
+        draw(estimate.x, estimate.y, estimate.values.T, levels=levels,
+             colors=colors, alpha=kws.get('alpha'))
+
+
+    def __colors(self, n, entry, key='color', **kws):
+        """Colors of n lines, from kws[key] or cycling through a color
+        scheme entry"""
+        colors = kws.get(key) if key in kws else self.cscheme[entry]
+        if isinstance(colors, str): return [colors] * n
+
+        return [colors[i % len(colors)] for i in range(n)]
+
+
+    def __minmax(self, ax, xs, ys, **kws):
+        """Indices of the samples kept by a min/max envelope on ax"""
+        k = kws.get
+        xlim = (k('xmin'), k('xmax')) if 'xmin' in kws and 'xmax' in kws else None
+
+        return decimate.minmax(xs, ys, self.__pixels(ax)[0], xlim=xlim,
+                               xscale=k('xscale'))
+
+
+    def __reduced(self, title, points, drawn, silent=False):
+        """Recording the reduction ratio of a plot"""
+        ratio = points / max(drawn, 1)
+        self.reductions.append({'plot': title, 'points': int(points),
+                                'drawn': int(drawn), 'ratio': ratio})
+
+        if not silent == True:
+            mprofile.logger.info('"%s" is drawing %d of %d points (%.1fx reduction)',
+                                 title, drawn, points, ratio)
+
+
+    def __drawgrid(self, ax, grid, alpha=None):
+        """Drawing the dense bins of a my_density.Grid2D as an image"""
+        cmap = self.compiled['cmap']
+        counts = grid.image()
+        if counts.count() == 0: return
+
+        norm = mcolors.LogNorm(vmin=counts.min(), vmax=max(counts.max(), 2))
+        xedges, yedges = grid.edges()
+
+        if grid.xlog or grid.ylog:
+            ax.pcolormesh(xedges, yedges, counts, cmap=cmap, norm=norm,
+                          alpha=alpha)
+        else:
+            ax.imshow(counts, cmap=cmap, norm=norm, alpha=alpha, origin='lower',
+                      extent=(xedges[0], xedges[-1], yedges[0], yedges[-1]),
+                      aspect='auto', interpolation='nearest')
 
 
     def __getparams(self, **kws):
-        """Extract keyword parameters"""
+        """Extract keyword parameters, or those resolved by a plan"""
+        if self.__resolved is not None: return self.__resolved
+
         params = {}
         k = kws.get
 
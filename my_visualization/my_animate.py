@@ -0,0 +1,349 @@
+"""
+my_animate.py
+Frame sequences rendered by swapping the data of the artists of one figure
+"""
+
+
+import collections
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import numpy as np
+
+import my_export as export
+
+
+ANIMATED = {'gif': 'GIF', 'png': 'PNG', 'apng': 'PNG'}
+LEVEL = 1
+
+_animation = None
+
+
+def kind(name):
+    """'sequence' for a name with a '{}' placeholder of the frame number,
+    e.g. 'frames/{:05d}.png', otherwise the animated format, 'GIF' or 'PNG'
+    (APNG)"""
+    if '{' in name: return 'sequence'
+
+    ext = os.path.splitext(name)[1][1:].lower()
+    if ext not in ANIMATED:
+        raise ValueError('Not an animated format: {}, should be one of {} or '
+                         'a numbered sequence'.format(ext, ', '.join(ANIMATED)))
+
+    return ANIMATED[ext]
+
+
+class Animation:
+    """Frames of a figure whose artists are built once
+
+    The series are drawn once by the methods of MyVisualization, with their
+    axes, labels, limits and colormaps. Every frame then only swaps their
+    data: lines (set_data), scatter points (set_offsets) and images
+    (set_data, keeping the norm of the first image). The static part of the
+    figure is drawn once and cached, a frame restores it and draws the
+    series on top of it, so the cost of a frame excludes the setup.
+
+    Limits, ticks and colorbars are those of the setup, give xmin, xmax,
+    ymin, ymax (or vmin, vmax) covering all the frames.
+
+    While frames are drawn, the series are animated and the figure is at
+    the dpi of the animation. save restores them at the end, call finish
+    after drawing frames with draw. The figure then shows the last frame.
+    """
+
+    def __init__(self, vis, dpi=None):
+        """Animation constructor
+
+        Parameters
+        ----------
+        vis : MyVisualization
+            With pyplot=False or the Agg backend
+        dpi : int, optional
+            Default: dpi of the figure
+        """
+        if not hasattr(vis.fig.canvas, 'buffer_rgba'):
+            raise TypeError('The canvas has no RGBA buffer, use pyplot=False '
+                            'or the Agg backend')
+
+        self.vis = vis
+        self.dpi = vis.fig.dpi if dpi is None else dpi
+        self.artists = []
+        self.background = None
+        self.bbox = None
+        self.restore = None
+
+
+    def plot(self, xs, ys, pos="111", ax=None, **kws):
+        """Line of the first frame, see MyVisualization.plot (not reduced)
+
+        Returns
+        -------
+        handle : int
+            Key of the line in the frames, its data being (xs, ys)
+        """
+        from matplotlib.lines import Line2D
+        return self.__track(Line2D, 'plot', (xs, ys),
+                            dict(kws, pos=pos, ax=ax, reduce=None))
+
+
+    def scatter(self, xs, ys, pos="111", ax=None, **kws):
+        """Points of the first frame, see MyVisualization.scatter (not reduced)
+
+        Returns
+        -------
+        handle : int
+            Key of the points in the frames, their data being (xs, ys)
+        """
+        from matplotlib.collections import PathCollection
+        return self.__track(PathCollection, 'scatter', (xs, ys),
+                            dict(kws, pos=pos, ax=ax, reduce=None))
+
+
+    def image(self, xys, pos="111", ax=None, **kws):
+        """Image of the first frame, see MyVisualization.image
+
+        Returns
+        -------
+        handle : int
+            Key of the image in the frames, its data being a 2D array
+        """
+        from matplotlib.image import AxesImage
+        return self.__track(AxesImage, 'image', (xys,),
+                            dict(kws, pos=pos, ax=ax))
+
+
+    def draw(self, frame):
+        """Rendering a frame
+
+        Parameter
+        ---------
+        frame : sequence or dict
+            Data of the series, in the order of their handles or by handle.
+            Series missing from a dict keep their data.
+
+        Returns
+        -------
+        rgba : (height, width, 4) array of uint8
+            View of the canvas buffer, cropped to the tight bounding box of
+            the setup, only valid until the next frame
+        """
+        if self.background is None: self.__setup()
+
+        # The recorded calls no longer describe the figure
+        if self.vis.calls is not None: self.vis.calls.valid = False
+
+        items = frame.items() if isinstance(frame, dict) else enumerate(frame)
+        for handle, data in items: _swap(self.artists[handle], data)
+
+        canvas = self.vis.fig.canvas
+        canvas.restore_region(self.background)
+        for artist in self.artists: artist.axes.draw_artist(artist)
+
+        rgba = np.asarray(canvas.buffer_rgba())
+        return rgba if self.bbox is None else export.crop(rgba, self.bbox, self.dpi)
+
+
+    def save(self, frames, name, fps=10, load=None, level=LEVEL):
+        """Rendering frames into a numbered PNG sequence or an animated file
+
+        Parameters
+        ----------
+        frames : iterable
+            Frames (see draw), or anything load turns into one
+        name : str
+            'path/{:05d}.png' for a PNG sequence numbered from 0, or a .gif,
+            .png or .apng animation. Sequence files are encoded by the
+            export thread pool while the next frames are drawn, animations
+            are encoded at the end and hold all their frames in memory.
+        fps : float, optional
+            Frames per second of animations
+        load : callable, optional
+            Turning an item of frames into a frame, e.g. reading a snapshot
+        level : int, optional
+            PNG compression level, from 0 (fastest) to 9 (smallest)
+
+        Returns
+        -------
+        n : int
+            Number of frames
+        """
+        frames = frames if load is None else map(load, frames)
+
+        try:
+            if kind(name) != 'sequence':
+                images = (_image(self.draw(f)) for f in frames)
+                return _animate(images, name, fps)
+
+            return self.__sequence(enumerate(frames), name, level)
+        finally:
+            self.finish()
+
+
+    def finish(self):
+        """Restoring the animated flags of the series and the dpi of the
+        figure, so that it is drawn and saved as usual"""
+        if self.restore is None: return
+
+        animated, dpi = self.restore
+        for artist, flag in zip(self.artists, animated): artist.set_animated(flag)
+        self.vis.fig.dpi = dpi
+        self.restore = None
+        self.background = None
+
+
+    def __sequence(self, frames, pattern, level):
+        """Writing numbered frames in the background, return their number"""
+        pool, pending, n = export.executor(), collections.deque(), 0
+
+        for i, frame in frames:
+            rgba = self.draw(frame).copy()
+            pending.append(pool.submit(export.write, rgba, pattern.format(i),
+                                       self.dpi, format='png', level=level))
+            while len(pending) > 2 * export.WORKERS: pending.popleft().result()
+            n += 1
+
+        for future in pending: future.result()
+        return n
+
+
+    def __track(self, cls, method, args, kws):
+        """Calling a drawing method, return the handle of the artist it drew"""
+        before = set(map(id, self.__children()))
+        getattr(self.vis, method)(*args, **kws)
+
+        new = [a for a in self.__children()
+               if id(a) not in before and isinstance(a, cls)]
+        if len(new) != 1:
+            raise ValueError('{} drew {} {}, expected one'.format(
+                method, len(new), cls.__name__))
+
+        self.artists.append(new[0])
+        self.background = None
+
+        return len(self.artists) - 1
+
+
+    def __children(self):
+        return [a for ax in self.vis.fig.axes for a in ax.get_children()]
+
+
+    def __setup(self):
+        """Drawing the static part of the figure once, and its tight
+        bounding box, within the canvas"""
+        from matplotlib.transforms import Bbox
+
+        fig, canvas = self.vis.fig, self.vis.fig.canvas
+
+        self.finish()
+        self.restore = [a.get_animated() for a in self.artists], fig.dpi
+        for artist in self.artists: artist.set_animated(True)
+        fig.dpi = self.dpi
+        canvas.draw()
+
+        self.background = canvas.copy_from_bbox(fig.bbox)
+        bbox = fig.get_tightbbox(canvas.get_renderer()).padded(
+            matplotlib.rcParams['savefig.pad_inches'])
+        self.bbox = Bbox.intersection(bbox, fig.bbox_inches)
+
+
+def render(setup, frames, name, fps=10, load=None, workers=None, level=LEVEL):
+    """Rendering frames across a pool of processes with Agg backend
+
+    Every process builds its Animation once and draws a contiguous range of
+    the frames, written as numbered PNG files. Animations are assembled
+    from them by the calling process.
+
+    Parameters
+    ----------
+    setup : callable
+        Picklable (e.g. module level) function returning an Animation
+    frames : iterable
+        Picklable frames, or items turned into frames by load in the
+        processes, e.g. paths or indices of snapshots
+    name : str
+        See Animation.save
+    fps : float, optional
+    load : callable, optional
+        Picklable, see Animation.save
+    workers : int, optional
+        Number of processes, default: number of CPUs
+    level : int, optional
+
+    Returns
+    -------
+    n : int
+        Number of frames
+    """
+    frames = list(frames)
+    workers = workers or os.cpu_count() or 1
+    size = max(1, math.ceil(len(frames) / (4 * workers)))
+    animated = kind(name) != 'sequence'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pattern = os.path.join(tmp, '{:06d}.png') if animated else name
+        chunks = [(start, frames[start:start + size], pattern, load, level)
+                  for start in range(0, len(frames), size)]
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init,
+                                 initargs=(setup,)) as pool:
+            n = sum(pool.map(_chunk, chunks))
+
+        if not animated: return n
+        return _animate((_read(pattern.format(i)) for i in range(n)), name, fps)
+
+
+def _swap(artist, data):
+    """Replacing the data of a tracked artist"""
+    from matplotlib.lines import Line2D
+    from matplotlib.image import AxesImage
+
+    if isinstance(artist, AxesImage): artist.set_data(data)
+    elif isinstance(artist, Line2D): artist.set_data(*data)
+    else: artist.set_offsets(np.column_stack(data))
+
+
+def _image(rgba):
+    from PIL import Image
+    return Image.fromarray(np.array(rgba))
+
+
+def _read(name):
+    from PIL import Image
+    with Image.open(name) as image:
+        image.load()
+        return image
+
+
+def _animate(images, name, fps):
+    """Writing PIL images as an animation, return their number
+
+    The encoders need all the frames at once, so they are held in memory.
+    """
+    images = list(images)
+    if not images: raise ValueError('No frames to write into {}'.format(name))
+
+    images[0].save(name, format=kind(name), save_all=True,
+                   append_images=images[1:], duration=1000 / fps, loop=0)
+
+    return len(images)
+
+
+def _init(setup):
+    matplotlib.use('Agg')
+
+    global _animation
+    _animation = setup()
+
+
+def _chunk(chunk):
+    start, frames, pattern, load, level = chunk
+    frames = frames if load is None else map(load, frames)
+
+    for i, frame in enumerate(frames, start):
+        export.write(_animation.draw(frame), pattern.format(i), _animation.dpi,
+                     format='png', level=level)
+
+    return len(chunk[1])
@@ -0,0 +1,82 @@
+"""
+my_batch.py
+Rendering many figures across a pool of processes
+"""
+
+
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+
+def render(spec):
+    """Rendering a single figure spec in the current process
+
+    Parameter
+    ---------
+    spec : dict
+        'name' : str, optional
+            Name reported back with the result
+        'figure' : dict, optional
+            Keyword arguments of MyVisualization, pyplot defaults to False
+        'calls' : list of (method, args) or (method, args, kws)
+            Methods of MyVisualization to call in order, e.g.
+            ('plot', (xs, ys), {'color': 'red'}) or ('save', ('fig.png',))
+
+    Returns
+    -------
+    result : dict
+        'name', 'ok', 'error' (formatted traceback or None) and 'seconds'
+    """
+    from main import MyVisualization
+
+    start = time.perf_counter()
+    vis, error = None, None
+
+    try:
+        vis = MyVisualization(**dict({'pyplot': False}, **spec.get('figure', {})))
+
+        for call in spec['calls']:
+            method, args, kws = (tuple(call) + ({},))[:3]
+            if method.startswith('_'):
+                raise ValueError('Not a public method: {}'.format(method))
+            getattr(vis, method)(*args, **kws)
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        if vis is not None: vis.close()
+
+    return {'name': spec.get('name'), 'ok': error is None, 'error': error,
+            'seconds': time.perf_counter() - start}
+
+
+def render_many(specs, workers=None):
+    """Rendering figure specs across a pool of processes with Agg backend
+
+    A failing figure does not stop the others, its traceback is reported in
+    its result instead.
+
+    Parameters
+    ----------
+    specs : list of dict
+        See render
+    workers : int, optional
+        Number of processes, default: number of CPUs
+
+    Returns
+    -------
+    results : list of dict
+        One result per spec, in the same order, see render
+    """
+    specs = list(specs)
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(specs) // (4 * workers))
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_agg) as pool:
+        return list(pool.map(render, specs, chunksize=chunksize))
+
+
+def _agg():
+    import matplotlib
+    matplotlib.use('Agg')
@@ -0,0 +1,211 @@
+"""
+my_cache.py
+On-disk cache of rendered figures, keyed by a hash of everything drawn
+"""
+
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+import matplotlib
+import numpy as np
+
+
+_sources = None
+
+
+def sources():
+    """Hash of the modules of the package, computed once per process, so
+    that changes to the code invalidate the figures it rendered"""
+    global _sources
+    if _sources is None:
+        h = hashlib.blake2b(digest_size=20)
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.py'): continue
+            with open(os.path.join(directory, name), 'rb') as f:
+                h.update(name.encode())
+                h.update(f.read())
+        _sources = h.hexdigest()
+
+    return _sources
+
+
+def settings():
+    """matplotlib rcParams as a string, except the backend ones, reading
+    them possibly selecting a backend"""
+    rc = matplotlib.rcParams
+    return repr([(k, rc[k]) for k in sorted(rc) if not k.startswith('backend')])
+
+
+class Recorder:
+    """Incremental hash of the calls made to draw a figure
+
+    Arrays are hashed through their buffers, paths of existing files through
+    their size and modification time. Values which can't be hashed, like
+    iterators, make the recorder invalid, so the figure is never cached.
+
+    The hash starts from the code of the package and the versions of
+    matplotlib and NumPy, and the rcParams are fed with every call and
+    with the key, as they apply both when drawing and when saving.
+    """
+
+    def __init__(self):
+        self.hash = hashlib.blake2b(digest_size=20)
+        self.valid = True
+
+        self.__feed((sources(), matplotlib.__version__, np.__version__))
+
+
+    def update(self, name, args=(), kws=None):
+        """Feeding a call
+
+        Parameters
+        ----------
+        name : str
+            Name of the method
+        args : tuple
+        kws : dict, optional
+        """
+        self.__feed(name)
+        self.__feed(tuple(args))
+        self.__feed(dict(kws or {}))
+        self.__feed(settings())
+
+
+    def hexdigest(self, *extra):
+        """Key of the calls fed so far, followed by the current rcParams and
+        extra values"""
+        recorder = Recorder()
+        recorder.hash = self.hash.copy()
+        for value in (settings(),) + extra: recorder.__feed(value)
+
+        return recorder.hash.hexdigest()
+
+
+    def __feed(self, value):
+        h = self.hash
+        h.update(type(value).__name__.encode())
+
+        if isinstance(value, list) and len(value) > 0 and \
+                isinstance(value[0], (int, float)):
+            value = np.asarray(value)
+            if value.dtype.hasobject: value = value.tolist()
+
+        if isinstance(value, np.ndarray) and value.dtype.hasobject:
+            self.__feed(value.tolist())
+        elif isinstance(value, np.ndarray):
+            h.update(str((value.dtype.str, value.shape)).encode())
+            h.update(memoryview(np.ascontiguousarray(value)).cast('B'))
+        elif isinstance(value, (list, tuple)):
+            h.update(str(len(value)).encode())
+            for v in value: self.__feed(v)
+        elif isinstance(value, dict):
+            h.update(str(len(value)).encode())
+            for k in sorted(value, key=str):
+                self.__feed(str(k))
+                self.__feed(value[k])
+        elif isinstance(value, (str, os.PathLike)):
+            h.update(os.fspath(value).encode())
+            if os.path.isfile(value):
+                stat = os.stat(value)
+                h.update(str((stat.st_size, stat.st_mtime_ns)).encode())
+        elif value is None or isinstance(value, (bool, int, float, complex,
+                                                 bytes, np.generic)):
+            h.update(repr(value).encode())
+        elif hasattr(value, 'get_position') and hasattr(value, 'name'):
+            # Axes, identified by their projection and their place in the figure
+            index = value.figure.axes.index(value) if value.figure else None
+            h.update(str((value.name, value.get_position().bounds, index)).encode())
+        else:
+            self.valid = False
+
+
+class FigureCache:
+    """Size-bounded, least-recently-used store of rendered figures
+
+    Entries are files named after their key, their modification time being
+    the time of last use, so several processes can share a directory.
+    """
+
+    def __init__(self, directory, maxbytes=2**30):
+        """FigureCache constructor
+
+        Parameters
+        ----------
+        directory : str
+        maxbytes : int, optional
+            Total size above which least recently used entries are evicted
+        """
+        self.directory = directory
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+
+    def fetch(self, key, name):
+        """Copying the entry of key to name, return whether it was found"""
+        path = self.__path(key, name)
+
+        try:
+            shutil.copyfile(path, name)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+
+        self.hits += 1
+        return True
+
+
+    def store(self, key, name):
+        """Adding the file name as the entry of key"""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        shutil.copyfile(name, tmp)
+        os.replace(tmp, self.__path(key, name))
+
+        self.evict()
+
+
+    def evict(self):
+        """Removing least recently used entries until under maxbytes"""
+        entries = self.__entries()
+        total = sum(size for _, size, _ in entries)
+
+        for path, size, _ in sorted(entries, key=lambda e: e[2]):
+            if total <= self.maxbytes: break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+    def stats(self):
+        """Hits, misses, number of entries and total size in bytes"""
+        entries = self.__entries()
+        return {'hits': self.hits, 'misses': self.misses,
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries)}
+
+
+    def __path(self, key, name):
+        return os.path.join(self.directory, key + os.path.splitext(name)[1])
+
+
+    def __entries(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.tmp') or not entry.is_file(): continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((entry.path, stat.st_size, stat.st_mtime))
+
+        return entries
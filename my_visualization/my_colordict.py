@@ -4,6 +4,15 @@ Main class of my_visualization package
 """
 
 
+import matplotlib
+import matplotlib.colors as mcolors
+
+
+LUTSIZE = 256
+
+_COMPILED = {}
+
+
 def get(cscheme):
     """Return colorscheme
 
@@ -12,7 +21,60 @@ def get(cscheme):
     cscheme : str
         Color scheme name
     """
-    return CDICT[str(cscheme) if cscheme in CDICT.keys() else 'RAINBOW']
+    return CDICT[_name(cscheme)]
+
+
+def register(name, cscheme):
+    """Adding (or replacing) a color scheme
+
+    Parameters
+    ----------
+    name : str
+        Color scheme name
+    cscheme : dict
+        Same keys as the schemes of CDICT
+    """
+    CDICT[str(name)] = cscheme
+    _COMPILED.pop(str(name), None)
+
+
+def compiled(cscheme):
+    """Return the compiled form of a colorscheme, built once and shared
+
+    Parameter
+    ---------
+    cscheme : str
+        Color scheme name
+
+    Returns
+    -------
+    compiled : dict
+        'cmap' : LinearSegmentedColormap of the 'dict' entry, registered
+            in matplotlib as 'my_<name>'
+    """
+    name = _name(cscheme)
+    if name not in _COMPILED: _COMPILED[name] = _compile(name, CDICT[name])
+
+    return _COMPILED[name]
+
+
+def _name(cscheme):
+    return str(cscheme) if cscheme in CDICT.keys() else 'RAINBOW'
+
+
+def _compile(name, cscheme):
+    cmap = mcolors.LinearSegmentedColormap('my_' + name, cscheme['dict'],
+                                           N=LUTSIZE)
+
+    try:
+        registry = matplotlib.colormaps
+    except AttributeError:
+        matplotlib.cm.register_cmap(cmap=cmap)
+    else:
+        if cmap.name in registry: registry.unregister(cmap.name)
+        registry.register(cmap)
+
+    return {'cmap': cmap}
 
 
 
@@ -0,0 +1,208 @@
+"""
+my_decimate.py
+Reducing long lines to the vertices which are visible at a given resolution
+"""
+
+
+import numpy as np
+
+
+def minmax(xs, ys, ncols, xlim=None, xscale='linear'):
+    """Indices of the samples drawn by a per-pixel-column min/max envelope
+
+    Keeps, for every pixel column, the samples with the smallest and the
+    largest y, plus the first and the last sample, so peaks are preserved
+    exactly while at most about 2 * ncols vertices are drawn.
+
+    Parameters
+    ----------
+    xs, ys : array
+    ncols : int
+        Number of pixel columns, e.g. the width of the axes in pixels
+    xlim : tuple of floats, optional
+        x range mapped onto the columns, default: range of xs. Samples
+        outside of it are dropped, except the neighbours of the samples
+        inside, so that the line still runs to the edges of the axes.
+    xscale : str, optional
+        'linear' or 'log'
+
+    Returns
+    -------
+    indices : array of int
+        Sorted indices into xs and ys
+    """
+    xs, ys = np.asarray(xs), np.asarray(ys)
+    n = ys.size
+    if n <= 2 * ncols: return np.arange(n)
+
+    if xlim is not None:
+        inside = _inside(xs, xlim, xscale)
+        if not inside.all():
+            edges = np.zeros(n, dtype=bool)
+            edges[:-1] |= inside[1:]
+            edges[1:] |= inside[:-1]
+
+            i = np.flatnonzero(inside)
+            kept = i[minmax(xs[i], ys[i], ncols, xlim, xscale)]
+            return np.union1d(kept, np.flatnonzero(edges & ~inside))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = np.log10(xs) if xscale == 'log' else xs
+        finite = np.isfinite(x) & np.isfinite(ys)
+
+    valid = None if finite.all() else np.flatnonzero(finite)
+    x, y = (x, ys) if valid is None else (x[valid], ys[valid])
+    if y.size == 0: return np.arange(0)
+
+    lo, hi = (np.min(x), np.max(x)) if xlim is None else xlim
+    if xscale == 'log' and xlim is not None: lo, hi = np.log10(lo), np.log10(hi)
+    scale = ncols / (hi - lo) if hi > lo else 0.0
+
+    order = None
+    if scale > 0 and np.all(x[1:] >= x[:-1]):
+        # Sorted samples, column boundaries found by bisection
+        starts = np.searchsorted(x, lo + np.arange(1, ncols) / scale)
+        starts = np.unique(np.r_[0, starts])
+        starts = starts[starts < y.size]
+    else:
+        cols = np.clip(((x - lo) * scale).astype(np.intp), 0, ncols - 1)
+        order = np.argsort(cols, kind='stable')
+        cols, y = cols[order], y[order]
+        starts = np.flatnonzero(np.r_[True, cols[1:] != cols[:-1]])
+
+    sizes = np.diff(np.r_[starts, y.size])
+
+    kept = [np.array([0, y.size - 1])]
+    for reduce in (np.minimum, np.maximum):
+        hits = np.flatnonzero(y == np.repeat(reduce.reduceat(y, starts), sizes))
+        kept.append(hits[np.searchsorted(hits, starts)])
+
+    kept = np.concatenate(kept)
+    if order is not None: kept = order[kept]
+    if valid is not None: kept = valid[kept]
+
+    return np.unique(kept)
+
+
+def _inside(xs, xlim, xscale):
+    """Whether each x is inside of xlim"""
+    lo, hi = min(xlim), max(xlim)
+    if xscale == 'log' and lo <= 0: return xs <= hi
+    return (xs >= lo) & (xs <= hi)
+
+
+class Envelope:
+    """Streaming min/max envelope of a line over buckets of samples
+
+    Samples are grouped in consecutive buckets and only the minimum and the
+    maximum of each bucket are kept. Whenever there are more than twice the
+    capacity of buckets, the bucket size is doubled and neighbouring buckets
+    are merged, so the memory is bounded whatever the number of samples.
+    """
+
+    def __init__(self, capacity):
+        """Envelope constructor
+
+        Parameters
+        ----------
+        capacity : int
+            Minimum number of buckets to keep, e.g. the width in pixels
+        """
+        self.capacity = max(int(capacity), 1)
+        self.size = 1
+        self.count = 0
+
+        # Per bucket: index, x and y of the minimum and of the maximum
+        self.buckets = np.empty((0, 6))
+
+
+    def add(self, xs, ys):
+        """Adding the next chunk of samples
+
+        Parameters
+        ----------
+        xs, ys : array
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        if ys.size == 0: return
+
+        offset = self.count
+        self.count += ys.size
+
+        # Samples completing the last, partial bucket
+        lead = min((-offset) % self.size, ys.size)
+        if lead > 0:
+            row = self.__reduce(offset, xs[:lead], ys[:lead])
+            self.buckets[-1:] = self.__merge(self.buckets[-1:], row)
+
+        if ys.size > lead:
+            rows = self.__reduce(offset + lead, xs[lead:], ys[lead:])
+            self.buckets = np.vstack([self.buckets, rows])
+
+        while self.buckets.shape[0] > 2 * self.capacity:
+            self.__coarsen()
+
+
+    def vertices(self):
+        """Return the xs, ys of the envelope, in the order of the samples"""
+        finite = np.isfinite(self.buckets[:, 2]) & np.isfinite(self.buckets[:, 5])
+        b = self.buckets[finite]
+
+        first = np.where(b[:, 0] <= b[:, 3], 0, 3)
+        second = 3 - first
+        rows = np.arange(b.shape[0])
+
+        i = np.column_stack([b[rows, first], b[rows, second]]).ravel()
+        x = np.column_stack([b[rows, first + 1], b[rows, second + 1]]).ravel()
+        y = np.column_stack([b[rows, first + 2], b[rows, second + 2]]).ravel()
+
+        keep = np.ones(i.size, dtype=bool)
+        keep[1:] = i[1:] != i[:-1]
+
+        return x[keep], y[keep]
+
+
+    def __reduce(self, start, xs, ys):
+        """Bucket rows of a chunk starting at a bucket boundary"""
+        n = ys.size
+        nb = -(-n // self.size)
+        pad = nb * self.size - n
+
+        lows = np.pad(np.where(np.isnan(ys), np.inf, ys), (0, pad),
+                      constant_values=np.inf).reshape(nb, self.size)
+        highs = np.pad(np.where(np.isnan(ys), -np.inf, ys), (0, pad),
+                       constant_values=-np.inf).reshape(nb, self.size)
+
+        imin = lows.argmin(axis=1) + np.arange(nb) * self.size
+        imax = highs.argmax(axis=1) + np.arange(nb) * self.size
+        xpad = np.pad(xs, (0, pad))
+
+        return np.column_stack([
+            imin + start, xpad[imin], lows.ravel()[imin],
+            imax + start, xpad[imax], highs.ravel()[imax]])
+
+
+    @staticmethod
+    def __merge(a, b):
+        """Merging pairs of bucket rows"""
+        out = a.copy()
+        lower = b[:, 2] < a[:, 2]
+        higher = b[:, 5] > a[:, 5]
+        out[lower, 0:3] = b[lower, 0:3]
+        out[higher, 3:6] = b[higher, 3:6]
+        return out
+
+
+    def __coarsen(self):
+        """Doubling the bucket size"""
+        self.size *= 2
+        ids = self.buckets[:, 0] // self.size
+
+        pairs = np.flatnonzero(ids[1:] == ids[:-1])
+        merged = self.__merge(self.buckets[pairs], self.buckets[pairs + 1])
+
+        keep = np.ones(self.buckets.shape[0], dtype=bool)
+        keep[pairs + 1] = False
+        self.buckets[pairs] = merged
+        self.buckets = self.buckets[keep]
@@ -0,0 +1,459 @@
+"""
+my_density.py
+Binning points into pixel-resolution density grids
+"""
+
+
+import copy
+import os
+
+import numpy as np
+
+import my_stream as stream
+
+
+CHUNKSIZE = 1 << 22
+BLOCK = 1 << 16
+
+
+class Grid2D:
+    """Regular 2D histogram of points which also remembers one point per bin
+
+    Bins holding a single point can be drawn back as exact markers, while
+    the rest of the grid is drawn as an image.
+
+    Without limits, the grid starts from the range of the first chunk and
+    doubles its range, merging pairs of bins, whenever a chunk falls outside
+    of it. This allows binning a stream in a single pass, at the price of
+    down to half of the requested resolution.
+    """
+
+    def __init__(self, xlim, ylim, shape, xscale='linear', yscale='linear'):
+        """Grid2D constructor
+
+        Parameters
+        ----------
+        xlim, ylim : tuple of floats or None
+            Data range covered by the grid, None to grow it with the data
+        shape : tuple of int
+            Number of bins along (x, y), rounded up to even numbers
+        xscale, yscale : str, optional
+            Spacing of the bins, 'linear' or 'log'
+        """
+        self.nx, self.ny = [int(n) + int(n) % 2 for n in shape]
+        self.xlog, self.ylog = xscale == 'log', yscale == 'log'
+        self.xgrow, self.ygrow = xlim is None, ylim is None
+        self.xlim = None if xlim is None else _transform(xlim, self.xlog)
+        self.ylim = None if ylim is None else _transform(ylim, self.ylog)
+        self.bounds = [np.inf, -np.inf, np.inf, -np.inf]
+
+        self.counts = np.zeros(self.nx * self.ny, dtype=np.int64)
+        self.px = np.zeros(self.nx * self.ny, dtype=np.float64)
+        self.py = np.zeros(self.nx * self.ny, dtype=np.float64)
+
+
+    def add(self, xs, ys):
+        """Adding points to the grid, in chunks of bounded size
+
+        Parameters
+        ----------
+        xs, ys : array
+        """
+        for i in range(0, len(xs), CHUNKSIZE):
+            x = np.asarray(xs[i:i + CHUNKSIZE])
+            y = np.asarray(ys[i:i + CHUNKSIZE])
+
+            if self.xgrow: self.__fit(x, 0)
+            if self.ygrow: self.__fit(y, 1)
+
+            ix = _index(x, self.xlim, self.nx, self.xlog)
+            iy = _index(y, self.ylim, self.ny, self.ylog)
+
+            inside = (ix >= 0) & (iy >= 0)
+            flat = iy[inside] * self.nx + ix[inside]
+
+            self.counts += np.bincount(flat, minlength=self.counts.size)
+            self.px[flat] = x[inside]
+            self.py[flat] = y[inside]
+
+            if flat.size > 0:
+                x, y = x[inside], y[inside]
+                b = self.bounds
+                self.bounds = [min(b[0], x.min()), max(b[1], x.max()),
+                               min(b[2], y.min()), max(b[3], y.max())]
+
+
+    def image(self, mincount=2):
+        """Counts as a (ny, nx) masked array, bins below mincount masked"""
+        counts = self.counts.reshape(self.ny, self.nx)
+        return np.ma.masked_less(counts, mincount)
+
+
+    def lone(self):
+        """Coordinates of the points which are alone in their bin"""
+        single = self.counts == 1
+        return self.px[single], self.py[single]
+
+
+    def edges(self):
+        """Bin edges along x and y in data coordinates"""
+        return (_edges(self.xlim, self.nx, self.xlog),
+                _edges(self.ylim, self.ny, self.ylog))
+
+
+    def __fit(self, values, axis):
+        """Growing the range of an axis until it covers the values"""
+        log = self.xlog if axis == 0 else self.ylog
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            v = np.log10(values) if log else np.asarray(values, dtype=np.float64)
+        v = v[np.isfinite(v)]
+        if v.size == 0: return
+
+        lo, hi = v.min(), v.max()
+        lim = self.xlim if axis == 0 else self.ylim
+
+        if lim is None:
+            lim = (lo, hi) if hi > lo else (lo, lo + 1.0)
+        while lo < lim[0] or hi > lim[1]:
+            left = lo < lim[0]
+            width = lim[1] - lim[0]
+            lim = (lim[0] - width, lim[1]) if left else (lim[0], lim[1] + width)
+            self.__coarsen(axis, left)
+
+        if axis == 0: self.xlim = lim
+        else: self.ylim = lim
+
+
+    def __coarsen(self, axis, left):
+        """Merging pairs of bins along an axis into one half of the grid"""
+        arrays = [a.reshape(self.ny, self.nx)
+                  for a in (self.counts, self.px, self.py)]
+        if axis == 1: arrays = [a.T for a in arrays]
+        counts, px, py = arrays
+
+        n = counts.shape[1]
+        half = slice(n // 2, n) if left else slice(0, n // 2)
+        second = counts[:, 1::2] > 0
+
+        merged = []
+        for a, m in ((counts, counts[:, ::2] + counts[:, 1::2]),
+                     (px, np.where(second, px[:, 1::2], px[:, ::2])),
+                     (py, np.where(second, py[:, 1::2], py[:, ::2]))):
+            out = np.zeros_like(a)
+            out[:, half] = m
+            merged.append(out.T if axis == 1 else out)
+
+        self.counts, self.px, self.py = [np.ascontiguousarray(a).ravel()
+                                         for a in merged]
+
+
+class Grid3D:
+    """Regular 3D histogram of points which also remembers one point per voxel
+
+    Used to draw large 3D point clouds as one marker per occupied voxel,
+    instead of depth sorting every point.
+    """
+
+    def __init__(self, xlim, ylim, zlim, shape):
+        """Grid3D constructor
+
+        Parameters
+        ----------
+        xlim, ylim, zlim : tuple of floats
+            Data range covered by the grid
+        shape : tuple of int
+            Number of voxels along (x, y, z)
+        """
+        self.shape = tuple(max(int(n), 1) for n in shape)
+        self.lims = [self.__range(lim) for lim in (xlim, ylim, zlim)]
+
+        size = int(np.prod(self.shape))
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.points = np.zeros((3, size), dtype=np.float64)
+
+
+    def add(self, xs, ys, zs):
+        """Adding points to the grid, in chunks of bounded size
+
+        Parameters
+        ----------
+        xs, ys, zs : array
+        """
+        for i in range(0, len(xs), CHUNKSIZE):
+            chunk = [np.asarray(v[i:i + CHUNKSIZE]) for v in (xs, ys, zs)]
+
+            flat = self.index(*chunk)
+            inside = flat >= 0
+            flat = flat[inside]
+
+            self.counts += np.bincount(flat, minlength=self.counts.size)
+            for axis, values in enumerate(chunk):
+                self.points[axis, flat] = values[inside]
+
+
+    def index(self, xs, ys, zs):
+        """Flat voxel index of each point, -1 for points outside of the grid"""
+        flat = np.zeros(np.shape(xs), dtype=np.intp)
+        outside = np.zeros(np.shape(xs), dtype=bool)
+
+        for values, (lo, hi), n in zip((xs, ys, zs), self.lims, self.shape):
+            with np.errstate(invalid='ignore'):
+                i = (np.asarray(values, dtype=np.float64) - lo) * (n / (hi - lo))
+                outside |= ~((i >= 0) & (i <= n))
+                flat = flat * n + np.clip(i, 0, n - 1).astype(np.intp)
+
+        flat[outside] = -1
+        return flat
+
+
+    def densest(self, n=None):
+        """Points and counts of the n most populated voxels
+
+        Returns
+        -------
+        xs, ys, zs : array
+            One point of each voxel
+        counts : array
+        """
+        occupied = np.flatnonzero(self.counts)
+        if n is not None and occupied.size > n:
+            top = np.argpartition(self.counts[occupied], -n)[-n:]
+            occupied = np.sort(occupied[top])
+
+        xs, ys, zs = self.points[:, occupied]
+        return xs, ys, zs, self.counts[occupied]
+
+
+    @staticmethod
+    def __range(lim):
+        lo, hi = float(lim[0]), float(lim[1])
+        if hi <= lo: hi = lo + 1.0
+        return lo, hi
+
+
+class Histogram:
+    """Regular 1D or 2D histogram filled chunk by chunk
+
+    Histograms with the same bins are mergeable, so partial histograms of
+    row ranges, files or processes can be filled separately and summed.
+    Log bins are regular in log10 of the values. Samples are binned against
+    the edges of the bins as np.histogram does, so the counts are the same,
+    values on the upper edge falling into the last bin. Every dimension has
+    an extra bin on each side, collecting the values outside of its range,
+    where NaNs and non-positive values of log axes also go, so a block of
+    samples is binned without masking them out.
+    """
+
+    def __init__(self, lims, bins, scales=None):
+        """Histogram constructor
+
+        Parameters
+        ----------
+        lims : list of tuple of floats
+            Data range of every dimension, e.g. [(xmin, xmax)]
+        bins : list of int
+            Number of bins of every dimension
+        scales : list of str, optional
+            Spacing of the bins of every dimension, 'linear' or 'log'
+        """
+        scales = scales or ['linear'] * len(lims)
+        if not len(lims) == len(bins) == len(scales):
+            raise ValueError('lims, bins and scales should have the same length')
+
+        self.logs = [scale == 'log' for scale in scales]
+        self.lims = [_transform(lim, log) for lim, log in zip(lims, self.logs)]
+        self.bins = [max(int(n), 1) for n in bins]
+        self.counts = np.zeros(int(np.prod([n + 2 for n in self.bins])),
+                               dtype=np.int64)
+
+        # Lower edge of every bin, outer ones included, the last bin being
+        # closed, and NaN closing the upper outer bin
+        self.__bounds = [np.r_[-np.inf, e[:-1], np.nextafter(e[-1], np.inf), np.nan]
+                       for e in self.edges()]
+
+
+    def add(self, *values, weights=None):
+        """Adding samples, in blocks small enough to stay in cache, unless
+        there are more bins
+
+        Unweighted 1D blocks are sorted, and counted by bisecting the edges
+        in them, as np.histogram does. Otherwise every sample is indexed.
+
+        Parameters
+        ----------
+        values : array, one per dimension
+        weights : array, optional
+            Counts become floats once weighted samples are added
+        """
+        # bincount sweeps all the bins, so blocks are at least as large
+        size, block = len(values[0]), max(BLOCK, self.counts.size)
+
+        if len(values) == 1 and weights is None:
+            bounds = self.__bounds[0][1:-1]
+            for i in range(0, size, block):
+                chunk = np.sort(values[0][i:i + block])
+                ends = np.searchsorted(chunk, bounds)
+                self.__accumulate(np.diff(ends, prepend=0, append=chunk.size))
+            return
+
+        f = np.empty(min(size, block))
+        flat, index = np.empty((2, f.size), dtype=np.intp)
+
+        for i in range(0, size, block):
+            m = min(block, size - i)
+            for dim, (v, lim, n, log, bounds) in enumerate(zip(
+                    values, self.lims, self.bins, self.logs, self.__bounds)):
+                if dim > 0: flat[:m] *= n + 2
+                _bin(v[i:i + m], lim, n, log, bounds, f[:m],
+                     index[:m] if dim else flat[:m])
+                if dim > 0: flat[:m] += index[:m]
+
+            w = None if weights is None else np.asarray(weights[i:i + m])
+            self.__accumulate(np.bincount(flat[:m], weights=w,
+                                          minlength=self.counts.size))
+
+
+    def fill(self, *sources, weights=None, chunksize=CHUNKSIZE, workers=None):
+        """Adding samples read from sources, chunk by chunk
+
+        Parameters
+        ----------
+        sources : array, np.memmap, path to a .npy file or iterator of chunks
+            One per dimension
+        weights : same as sources, optional
+        chunksize : int, optional
+        workers : int, optional
+            Splitting the rows of .npy paths between that many processes,
+            each filling a partial histogram
+
+        Returns
+        -------
+        self : Histogram
+        """
+        if workers is None or workers <= 1:
+            blocks = [stream.blocks(s, chunksize) for s in sources]
+            if weights is not None: blocks.append(stream.blocks(weights, chunksize))
+            for chunk in zip(*blocks):
+                if weights is None: self.add(*chunk)
+                else: self.add(*chunk[:-1], weights=chunk[-1])
+            return self
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        paths = list(sources) + ([] if weights is None else [weights])
+        if not all(isinstance(p, (str, os.PathLike)) for p in paths):
+            raise TypeError('Filling with workers needs paths to .npy files')
+
+        nrows = len(stream.load(paths[0]))
+        step = max(1, -(-nrows // (4 * workers)))
+        tasks = [(self.empty(), paths, weights is not None, start, start + step,
+                  chunksize) for start in range(0, nrows, step)]
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return self.merge(*pool.map(_fill, tasks))
+
+
+    def merge(self, *others):
+        """Adding the counts of histograms with the same bins, return self"""
+        for other in others:
+            if other.bins != self.bins or other.lims != self.lims or \
+               other.logs != self.logs:
+                raise ValueError('Histograms with different bins cannot be merged')
+            self.__accumulate(other.counts)
+
+        return self
+
+
+    def empty(self):
+        """New histogram with the same bins and no counts"""
+        hist = copy.copy(self)
+        hist.counts = np.zeros(self.counts.size, dtype=np.int64)
+        return hist
+
+
+    def values(self):
+        """Counts as an array of shape bins"""
+        padded = self.counts.reshape([n + 2 for n in self.bins])
+        return padded[(slice(1, -1),) * len(self.bins)]
+
+
+    def outside(self):
+        """Number, or weight, of the samples outside of the bins"""
+        return self.counts.sum() - self.values().sum()
+
+
+    def edges(self):
+        """Bin edges of every dimension in data coordinates"""
+        return [_edges(lim, n, log)
+                for lim, n, log in zip(self.lims, self.bins, self.logs)]
+
+
+    def __accumulate(self, counts):
+        if counts.dtype != self.counts.dtype:
+            self.counts = self.counts.astype(np.result_type(self.counts, counts))
+        self.counts += counts
+
+
+def _fill(task):
+    """Filling a partial histogram with rows [start, stop) of .npy files"""
+    hist, paths, weighted, start, stop, chunksize = task
+    arrays = [np.load(p, mmap_mode='r')[start:stop] for p in paths]
+
+    for i in range(0, stop - start, chunksize):
+        chunk = [a[i:i + chunksize] for a in arrays]
+        if weighted: hist.add(*chunk[:-1], weights=chunk[-1])
+        else: hist.add(*chunk)
+
+    return hist
+
+
+def _bin(values, lim, n, log, bounds, f, index):
+    """Index of each value among the n bins of lim and the two outer bins,
+    0 below (or NaN) and n + 1 above, written into index
+
+    Computed in float64 in f, then moved by one bin where rounding crossed
+    one of the bounds, the lower edges of the bins set by Histogram, as
+    np.histogram does. The buffers are reused from block to block.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if log: np.log10(values, out=f, dtype=np.float64)
+        else: f[:] = values
+        f -= lim[0]
+        f *= n / (lim[1] - lim[0])
+
+    np.fmax(f, -1, out=f)
+    np.fmin(f, n, out=f)
+    np.floor(f, out=f)
+    f += 1
+    index[:] = f
+
+    np.take(bounds, index, out=f)
+    index -= values < f
+    np.take(bounds, index + 1, out=f)
+    index += values >= f
+
+
+def _transform(lim, log):
+    lo, hi = float(lim[0]), float(lim[1])
+    if log: lo, hi = np.log10(lo), np.log10(hi)
+    if hi <= lo: hi = lo + 1.0
+    return lo, hi
+
+
+def _edges(lim, n, log):
+    e = np.linspace(lim[0], lim[1], n + 1)
+    return 10**e if log else e
+
+
+def _index(values, lim, n, log):
+    """Bin index of each value, -1 for values outside of the grid"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if log: values = np.log10(values)
+        i = (values - lim[0]) * (n / (lim[1] - lim[0]))
+
+    outside = ~((i >= 0) & (i <= n))
+    i = np.minimum(i, n - 1, out=i).astype(np.intp)
+    i[outside] = -1
+
+    return i
@@ -0,0 +1,167 @@
+"""
+my_export.py
+Writing a rendered canvas to raster files, in the background if needed
+"""
+
+
+import concurrent.futures
+import os
+
+import matplotlib
+import numpy as np
+
+
+RASTER = {'png': 'PNG', 'jpg': 'JPEG', 'jpeg': 'JPEG', 'tif': 'TIFF',
+          'tiff': 'TIFF', 'webp': 'WEBP'}
+WORKERS = 4
+RASTERIZE = 20000
+
+_executor = None
+
+
+def fmt(name):
+    """Format of an output, from its extension or savefig.format for files"""
+    if isinstance(name, (str, os.PathLike)):
+        ext = os.path.splitext(os.fspath(name))[1][1:].lower()
+        if ext: return ext
+
+    return matplotlib.rcParams['savefig.format']
+
+
+def executor():
+    """Thread pool shared by background saves
+
+    Encoding (zlib, libjpeg) releases the GIL, so threads are enough to
+    overlap it with building the next figure.
+    """
+    global _executor
+    if _executor is None:
+        _executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=WORKERS, thread_name_prefix='my_visualization')
+
+    return _executor
+
+
+def crop(rgba, bbox, dpi):
+    """Pixels of an RGBA canvas inside a bbox in inches, None if the bbox
+    leaves the canvas
+
+    Parameters
+    ----------
+    rgba : (height, width, 4) array
+    bbox : matplotlib.transforms.Bbox
+    dpi : float
+    """
+    height, width = rgba.shape[:2]
+    x0, x1 = int(round(bbox.x0 * dpi)), int(round(bbox.x1 * dpi))
+    y0, y1 = height - int(round(bbox.y1 * dpi)), height - int(round(bbox.y0 * dpi))
+
+    if x0 < 0 or y0 < 0 or x1 > width or y1 > height: return None
+    return rgba[y0:y1, x0:x1]
+
+
+def write(rgba, name, dpi, cache=None, key=None, format=None, level=None,
+          quality=None):
+    """Encoding an RGBA array into name, then storing it in the cache
+
+    Parameters
+    ----------
+    rgba : (height, width, 4) array of uint8
+    name : str or file-like object
+    dpi : float
+    cache : my_cache.FigureCache, optional
+    key : str, optional
+        Key of name in cache
+    format : str, optional
+        Default: from the extension of name
+    level : int, optional
+        PNG compression level, 0 to 9
+    quality : int, optional
+        JPEG and lossy WebP quality, 0 to 100
+    """
+    from PIL import Image
+
+    format = (format or fmt(name)).lower()
+    if format not in RASTER:
+        raise ValueError('Not a raster format: {}, should be one of {}'.format(
+            format, ', '.join(RASTER)))
+
+    kind = RASTER[format]
+    options = {'dpi': (dpi, dpi)}
+    if kind == 'PNG' and level is not None: options['compress_level'] = level
+    if kind == 'WEBP': options['lossless'] = quality is None
+    if kind in ('JPEG', 'WEBP') and quality is not None: options['quality'] = quality
+
+    image = Image.fromarray(np.ascontiguousarray(rgba))
+    if kind == 'JPEG':
+        white = Image.new('RGBA', image.size, 'white')
+        image = Image.alpha_composite(white, image).convert('RGB')
+    image.save(name, format=kind, **options)
+
+    if cache is not None and key is not None: cache.store(key, name)
+
+
+def complexity(artist):
+    """Number of vertices an artist writes in vector outputs, None if it
+    can't be rasterized or is already raster"""
+    from matplotlib.collections import Collection
+    from matplotlib.lines import Line2D
+
+    if isinstance(artist, Line2D):
+        n = len(artist.get_xydata())
+        marker = artist.get_marker()
+        if marker not in (None, '', ' ', 'None', 'none'):
+            n *= 1 + len(artist.get_path().vertices)
+        return n
+
+    if not isinstance(artist, Collection): return None
+
+    if hasattr(artist, 'get_coordinates'):
+        # QuadMesh, drawn as one 4-vertex path per quad
+        rows, cols = artist.get_coordinates().shape[:2]
+        return 4 * max(rows - 1, 0) * max(cols - 1, 0)
+
+    paths = artist.get_paths()
+    if len(paths) == 0: return 0
+
+    vertices = sum(len(p.vertices) for p in paths)
+    offsets = len(artist.get_offsets())
+    return max(vertices, vertices * offsets // len(paths))
+
+
+def layers(fig, threshold=RASTERIZE):
+    """Data layers of the axes of fig, and whether they should be rasterized
+
+    Parameters
+    ----------
+    fig : Figure
+    threshold : int, optional
+        Number of vertices above which a layer is rasterized
+
+    Returns
+    -------
+    layers : list of (artist, dict)
+        'axes' index, 'layer' type, 'label', 'vertices' and 'rasterized'.
+        Layers of 3D axes are not rasterized, matplotlib ignoring it.
+    """
+    decisions = []
+    for i, ax in enumerate(fig.axes):
+        limit = np.inf if ax.name == '3d' else threshold
+        for artist in ax.get_children():
+            n = complexity(artist)
+            if n is None: continue
+
+            label = artist.get_label()
+            decisions.append((artist, {
+                'axes': i, 'layer': type(artist).__name__,
+                'label': None if label.startswith('_') else label,
+                'vertices': n,
+                'rasterized': artist.get_rasterized() or n > limit}))
+
+    return decisions
+
+
+def run(jobs, result=None):
+    """Running jobs in order, return result"""
+    for job in jobs: job()
+    return result
@@ -0,0 +1,122 @@
+"""
+my_kde.py
+Gaussian kernel density estimates of binned points, by FFT convolution
+"""
+
+
+import numpy as np
+
+
+BINS = 256
+LEVELS = (0.5, 0.9, 0.99)
+TRUNCATE = 4.0
+
+
+class KDE:
+    """Gaussian kernel density estimate of 2D points, on a regular grid
+
+    The points are binned first, the counts are then convolved with the
+    kernel by FFT, so the cost is linear in the number of points plus
+    O(G log G) for a grid of G bins, however many points the estimate is
+    evaluated at. The kernel covariance is the covariance of the points
+    (from the bins) scaled by Scott's factor n**(-1/6), as for
+    scipy.stats.gaussian_kde. Log axes are estimated in log10 of the data.
+
+    The grid is extended beyond the bins by the extent of the kernel,
+    TRUNCATE standard deviations, so that contours close.
+    """
+
+    def __init__(self, counts, edges, logs=(False, False), bandwidth=None):
+        """KDE constructor
+
+        Parameters
+        ----------
+        counts : (nx, ny) array
+            Number, or weight, of points per bin
+        edges : tuple of arrays
+            Bin edges along x and y in data coordinates
+        logs : tuple of bool, optional
+            Whether the bins of x and y are regular in log10
+        bandwidth : float, optional
+            Factor of the covariance of the points, default: Scott's factor
+        """
+        counts = np.asarray(counts, dtype=np.float64)
+        self.logs = tuple(logs)
+        edges = [np.log10(e) if log else np.asarray(e, dtype=np.float64)
+                 for e, log in zip(edges, self.logs)]
+        widths = np.array([e[1] - e[0] for e in edges])
+        centers = [0.5 * (e[1:] + e[:-1]) for e in edges]
+
+        self.n = counts.sum()
+        if self.n <= 0: raise ValueError('No points to estimate a density from')
+
+        factor = self.n**(-1 / 6) if bandwidth is None else bandwidth
+        kernel, pads = _kernel(factor**2 * _covariance(counts, centers, widths))
+
+        padded = np.pad(counts, [(p, p) for p in pads])
+        self.values = _convolve(padded, kernel) / (self.n * widths.prod())
+        self.values = np.maximum(self.values, 0)
+        self.area = widths.prod()
+
+        self.x, self.y = [np.concatenate([c[0] - w * np.arange(p, 0, -1), c,
+                                          c[-1] + w * np.arange(1, p + 1)])
+                          for c, w, p in zip(centers, widths, pads)]
+        if self.logs[0]: self.x = 10**self.x
+        if self.logs[1]: self.y = 10**self.y
+
+
+    def levels(self, probabilities=LEVELS):
+        """Iso-density levels enclosing the given probabilities, ascending
+
+        Parameter
+        ---------
+        probabilities : list of float
+            Fractions of the points inside the contours, e.g. [0.5, 0.9]
+        """
+        density = np.sort(self.values, axis=None)[::-1]
+        mass = np.cumsum(density) * self.area
+        mass /= mass[-1]
+
+        i = np.searchsorted(mass, np.clip(probabilities, 0, 1))
+        levels = density[np.minimum(i, density.size - 1)]
+
+        return np.unique(levels[levels > 0])
+
+
+def _covariance(counts, centers, widths):
+    """Covariance of binned points, floored at one bin along each axis"""
+    x, y = np.meshgrid(*centers, indexing='ij')
+    n = counts.sum()
+    mx, my = (counts * x).sum() / n, (counts * y).sum() / n
+    dx, dy = x - mx, y - my
+
+    cov = np.array([[(counts * dx * dx).sum(), (counts * dx * dy).sum()],
+                    [(counts * dx * dy).sum(), (counts * dy * dy).sum()]]) / n
+    cov[np.diag_indices(2)] = np.maximum(np.diag(cov), widths**2)
+    cov /= np.outer(widths, widths)
+
+    return cov
+
+
+def _kernel(cov):
+    """Normalized Gaussian of covariance cov (in bins) on a grid of bins,
+    and its half-width in bins along each axis"""
+    pads = [int(np.ceil(TRUNCATE * np.sqrt(v))) for v in np.diag(cov)]
+    i, j = np.meshgrid(*[np.arange(-p, p + 1) for p in pads], indexing='ij')
+
+    inv = np.linalg.inv(cov)
+    kernel = np.exp(-0.5 * (inv[0, 0] * i * i + 2 * inv[0, 1] * i * j +
+                            inv[1, 1] * j * j))
+
+    return kernel / kernel.sum(), pads
+
+
+def _convolve(values, kernel):
+    """Same-size linear convolution by real FFTs"""
+    shape = [n + k - 1 for n, k in zip(values.shape, kernel.shape)]
+    spectrum = np.fft.rfft2(values, shape) * np.fft.rfft2(kernel, shape)
+    full = np.fft.irfft2(spectrum, shape)
+
+    start = [k // 2 for k in kernel.shape]
+    return full[start[0]:start[0] + values.shape[0],
+                start[1]:start[1] + values.shape[1]]
@@ -0,0 +1,308 @@
+"""
+my_live.py
+Ring buffers and blitted redraws for live updating plots
+"""
+
+
+import numpy as np
+
+import my_decimate as decimate
+
+
+MARGIN = 0.1
+
+
+class RingBuffer:
+    """Fixed capacity buffer keeping the last samples
+
+    Every sample is written twice, at i and i + capacity, so the content is
+    always readable as a contiguous view without copying.
+    """
+
+    def __init__(self, capacity, dtype=np.float64):
+        """RingBuffer constructor
+
+        Parameters
+        ----------
+        capacity : int
+        dtype : numpy dtype, optional
+        """
+        self.capacity = int(capacity)
+        self.data = np.zeros(2 * self.capacity, dtype=dtype)
+        self.head = 0
+        self.size = 0
+
+
+    def extend(self, values):
+        """Appending values, dropping the oldest ones beyond the capacity"""
+        values = np.asarray(values, dtype=self.data.dtype).ravel()
+        values = values[-self.capacity:]
+        n = values.size
+
+        first = min(n, self.capacity - self.head)
+        for offset in (0, self.capacity):
+            start = self.head + offset
+            self.data[start:start + first] = values[:first]
+            self.data[offset:offset + n - first] = values[first:]
+
+        self.head = (self.head + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+
+    def view(self):
+        """Contiguous, oldest first, view of the content"""
+        start = (self.head - self.size) % self.capacity
+        return self.data[start:start + self.size]
+
+
+class Series:
+    """Live series, appending samples to an existing artist"""
+
+    def __init__(self, artist, ax, capacity, max_points, autoscale=True):
+        """Series constructor
+
+        Parameters
+        ----------
+        artist : matplotlib Artist
+        ax : Axes obj
+        capacity : int
+            Number of last samples kept
+        max_points : int
+            Maximum number of points handed to the artist
+        autoscale : bool, optional
+            Growing the limits of ax when the samples leave them
+        """
+        self.artist = artist
+        self.ax = ax
+        self.xs = RingBuffer(capacity)
+        self.ys = RingBuffer(capacity)
+        self.max_points = max_points
+        self.autoscale = autoscale
+        self.artists = [artist]
+        self.dirty = False
+
+
+    def append(self, xs, ys):
+        """Appending new samples
+
+        Parameters
+        ----------
+        xs, ys : number or array
+        """
+        self.xs.extend(xs)
+        self.ys.extend(ys)
+        self.dirty = True
+
+
+    def bounds(self):
+        """(xmin, xmax, ymin, ymax) of the content, None if empty"""
+        if self.xs.size == 0: return None
+
+        xs, ys = self.xs.view(), self.ys.view()
+        return np.nanmin(xs), np.nanmax(xs), np.nanmin(ys), np.nanmax(ys)
+
+
+class Line(Series):
+    """Live Line2D, drawn as its per-pixel-column min/max envelope"""
+
+    def update(self):
+        xs, ys = self.xs.view(), self.ys.view()
+
+        if xs.size > self.max_points:
+            i = decimate.minmax(xs, ys, self.max_points // 2,
+                                xlim=self.ax.get_xlim(),
+                                xscale=self.ax.get_xscale())
+            xs, ys = xs[i], ys[i]
+
+        self.artist.set_data(xs, ys)
+        self.dirty = False
+
+
+class Scatter(Series):
+    """Live PathCollection, strided down to max_points markers, or drawn as
+    a density image when given one
+
+    The image counts the samples per pixel of the axes, so every sample is
+    shown whatever the number of markers it replaces. The counts are kept
+    up to date as samples are appended and dropped from the buffer, and
+    only recounted when the limits or the size of the axes change. Axes
+    with a log scale are always strided.
+    """
+
+    def __init__(self, artist, ax, capacity, max_points, autoscale=True,
+                 image=None):
+        """Scatter constructor
+
+        Parameters
+        ----------
+        Same as Series
+        image : AxesImage, optional
+            Image showing the counts of samples per pixel, colored by its
+            cmap and its LogNorm, when there are more than max_points
+            samples
+        """
+        super().__init__(artist, ax, capacity, max_points, autoscale)
+        self.image = image
+        if image is not None: self.artists.append(image)
+
+        # Pixel grid, limits and counts (padded by one outer bin per side)
+        self.grid = None
+
+
+    def append(self, xs, ys):
+        if self.grid is not None:
+            xs = np.asarray(xs, dtype=np.float64).ravel()
+            ys = np.asarray(ys, dtype=np.float64).ravel()
+            grid, counts = self.grid
+
+            drop = min(self.xs.size, self.xs.size + ys.size - self.xs.capacity)
+            if drop > 0:
+                old = _pixels(grid, self.xs.view()[:drop], self.ys.view()[:drop])
+                counts -= np.bincount(old, minlength=counts.size).reshape(counts.shape)
+
+            new = _pixels(grid, xs[-self.xs.capacity:], ys[-self.xs.capacity:])
+            counts += np.bincount(new, minlength=counts.size).reshape(counts.shape)
+
+        super().append(xs, ys)
+
+
+    def update(self):
+        xs, ys = self.xs.view(), self.ys.view()
+
+        dense = (self.image is not None and xs.size > self.max_points and
+                 self.ax.get_xscale() == 'linear' and
+                 self.ax.get_yscale() == 'linear')
+        if dense: self.__draw(xs, ys)
+        else: self.grid = None
+        if self.image is not None: self.image.set_visible(dense)
+
+        step = 1 if dense else max(1, -(-xs.size // self.max_points))
+        xs, ys = (xs[:0], ys[:0]) if dense else (xs[::step], ys[::step])
+        self.artist.set_offsets(np.column_stack([xs, ys]))
+        self.dirty = False
+
+
+    def __draw(self, xs, ys):
+        """Showing the counts of the pixel grid of the axes in the image"""
+        grid = (self.ax.get_xlim(), self.ax.get_ylim(),
+                max(int(self.ax.bbox.width), 1), max(int(self.ax.bbox.height), 1))
+
+        if self.grid is None or self.grid[0] != grid:
+            (_, _, nx, ny) = grid
+            counts = np.bincount(_pixels(grid, xs, ys), minlength=(nx + 2) * (ny + 2))
+            self.grid = grid, counts.reshape(ny + 2, nx + 2)
+
+        (x0, x1), (y0, y1), _, _ = grid
+        counts = self.grid[1][1:-1, 1:-1]
+
+        # Colored here, as matplotlib draws RGBA images about 3 times faster
+        norm, cmap = self.image.norm, self.image.cmap
+        norm.vmax = max(counts.max(), 2)
+        self.image.set_data(cmap(norm(counts), bytes=True))
+        self.image.set_extent((x0, x1, y0, y1))
+
+
+class Live:
+    """Blitted redraws of the live series of a figure
+
+    The static part of every axes (frame, ticks, labels and other layers)
+    is drawn once and cached. A refresh restores it and draws only the
+    series of the axes which received new samples. The whole canvas is
+    redrawn only when the data leaves the limits of an axes, which are
+    then grown with a margin.
+    """
+
+    def __init__(self, fig):
+        self.fig = fig
+        self.series = []
+        self.backgrounds = None
+
+
+    def add(self, series):
+        """Registering a new series"""
+        for a in series.artists: a.set_animated(True)
+        self.series.append(series)
+        self.backgrounds = None
+
+        return series
+
+
+    def static(self, static):
+        """Drawing the series with the rest of the figure, up to date, e.g.
+        while saving it (static=True), or only by refresh (static=False)"""
+        for s in self.series:
+            if static and s.dirty: s.update()
+            for a in s.artists: a.set_animated(not static)
+
+        self.backgrounds = None
+
+
+    def refresh(self):
+        """Redrawing the changed series"""
+        canvas = self.fig.canvas
+
+        if self.__rescale() or self.backgrounds is None:
+            for s in self.series: s.update()
+            canvas.draw()
+            self.backgrounds = {s.ax: canvas.copy_from_bbox(s.ax.bbox)
+                                for s in self.series}
+            axes = self.backgrounds.keys()
+        else:
+            axes = {s.ax for s in self.series if s.dirty}
+
+        for ax in axes:
+            canvas.restore_region(self.backgrounds[ax])
+            for s in self.series:
+                if s.ax is not ax: continue
+                if s.dirty: s.update()
+                for a in s.artists: ax.draw_artist(a)
+            canvas.blit(ax.bbox)
+
+
+    def __rescale(self):
+        """Fitting the limits of the axes whose series left them"""
+        bounds, leaving = {}, set()
+
+        for s in self.series:
+            b = s.bounds()
+            if b is None: continue
+
+            old = bounds.get(s.ax, b)
+            bounds[s.ax] = (min(old[0], b[0]), max(old[1], b[1]),
+                            min(old[2], b[2]), max(old[3], b[3]))
+
+            xlim, ylim = s.ax.get_xlim(), s.ax.get_ylim()
+            if s.dirty and s.autoscale and (b[0] < xlim[0] or b[1] > xlim[1] or
+                            b[2] < ylim[0] or b[3] > ylim[1]):
+                leaving.add(s.ax)
+
+        for ax in leaving:
+            xmin, xmax, ymin, ymax = bounds[ax]
+            ax.set_xlim(*_margins(xmin, xmax))
+            ax.set_ylim(*_margins(ymin, ymax))
+
+        return len(leaving) > 0
+
+
+def _pixels(grid, xs, ys):
+    """Flat indices of the pixels of xs, ys in a grid padded by one outer
+    bin per side, which gathers the samples outside of it (and NaNs)"""
+    (x0, x1), (y0, y1), nx, ny = grid
+
+    fx = (xs - x0) * (nx / (x1 - x0))
+    fy = (ys - y0) * (ny / (y1 - y0))
+    for f, n in ((fx, nx), (fy, ny)):
+        np.fmax(f, -1, out=f)
+        np.fmin(f, n, out=f)
+        f += 1
+
+    flat = fy.astype(np.intp)
+    flat *= nx + 2
+    flat += fx.astype(np.intp)
+
+    return flat
+
+
+def _margins(lo, hi):
+    margin = MARGIN * (hi - lo) if hi > lo else 0.5
+    return lo - margin, hi + margin
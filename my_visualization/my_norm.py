@@ -0,0 +1,134 @@
+"""
+my_norm.py
+Color normalizations of images, from statistics of a bounded sample
+"""
+
+
+import numpy as np
+from matplotlib import colors as mcolors
+
+
+SAMPLESIZE = 1 << 18
+LEVELS = 256
+MODES = ('linear', 'percentile', 'log', 'symlog', 'asinh', 'hist')
+
+
+def sample(data, size=SAMPLESIZE):
+    """Finite values of a strided subgrid of about size elements
+
+    The stride is the same along every axis, so a memory-mapped array is
+    only read on the rows of the subgrid.
+
+    Parameters
+    ----------
+    data : array or np.memmap
+    size : int, optional
+    """
+    data = data if isinstance(data, np.ndarray) else np.asarray(data)
+    step = max(1, int(np.ceil((data.size / size)**(1 / max(data.ndim, 1)))))
+    values = np.asarray(data[(slice(None, None, step),) * data.ndim],
+                        dtype=np.float32).ravel()
+
+    return values[np.isfinite(values)]
+
+
+def norm(data, mode='linear', vmin=None, vmax=None, percentiles=(1, 99),
+         width=None):
+    """Normalization of data, its statistics taken from a sample
+
+    Parameters
+    ----------
+    data : array or np.memmap
+    mode : str, optional
+        'linear', 'percentile', 'log', 'symlog', 'asinh' or 'hist'
+    vmin, vmax : float or None
+        Default: min/max of the sample, or its percentiles for 'percentile'
+    percentiles : tuple of float, optional
+        Lower and upper percentiles clipped by 'percentile'
+    width : float, optional
+        Range around zero kept linear by 'symlog' and 'asinh', default:
+        median of the absolute values of the sample
+
+    Returns
+    -------
+    norm : matplotlib.colors.Normalize
+    """
+    if mode not in MODES:
+        raise ValueError('Unknown normalization: {}, should be one of {}'.format(
+            mode, ', '.join(MODES)))
+
+    values = sample(data)
+    if mode == 'log': values = values[values > 0]
+    if values.size == 0: values = np.array([0.0, 1.0], dtype=np.float32)
+
+    if mode == 'percentile':
+        lo, hi = np.percentile(values, percentiles)
+    else:
+        lo, hi = values.min(), values.max()
+
+    vmin = float(lo) if vmin is None else vmin
+    vmax = float(hi) if vmax is None else vmax
+
+    if width is None and mode in ('symlog', 'asinh'):
+        width = float(np.median(np.abs(values))) or 1.0
+
+    if mode == 'log':
+        return mcolors.LogNorm(vmin=vmin, vmax=vmax)
+    elif mode == 'symlog':
+        return mcolors.SymLogNorm(width, vmin=vmin, vmax=vmax)
+    elif mode == 'asinh':
+        return Asinh(width, vmin=vmin, vmax=vmax)
+    elif mode == 'hist':
+        return Equalize(values, vmin=vmin, vmax=vmax)
+
+    return mcolors.Normalize(vmin=vmin, vmax=vmax)
+
+
+class Asinh(mcolors.Normalize):
+    """Inverse hyperbolic sine stretch, linear within width of zero"""
+
+    def __init__(self, width, vmin=None, vmax=None, clip=False):
+        super().__init__(vmin=vmin, vmax=vmax, clip=clip)
+        self.width = width
+
+
+    def __call__(self, value, clip=None):
+        result, is_scalar = self.process_value(value)
+        self.autoscale_None(result)
+
+        lo, hi = np.arcsinh(np.array([self.vmin, self.vmax]) / self.width)
+        scale = 1.0 / (hi - lo) if hi > lo else 0.0
+        result = np.ma.array((np.arcsinh(result.data / self.width) - lo) * scale,
+                             mask=np.ma.getmask(result), copy=False)
+
+        return result[0] if is_scalar else result
+
+
+    def inverse(self, value):
+        lo, hi = np.arcsinh(np.array([self.vmin, self.vmax]) / self.width)
+        return self.width * np.sinh(lo + np.asarray(value) * (hi - lo))
+
+
+class Equalize(mcolors.Normalize):
+    """Histogram equalization, mapping the quantiles of a sample to even
+    steps of the colormap"""
+
+    def __init__(self, values, vmin=None, vmax=None, clip=False):
+        super().__init__(vmin=vmin, vmax=vmax, clip=clip)
+        lo = -np.inf if vmin is None else vmin
+        hi = np.inf if vmax is None else vmax
+        values = np.clip(values, lo, hi)
+        self.quantiles = np.percentile(values, np.linspace(0, 100, LEVELS))
+        self.levels = np.linspace(0, 1, LEVELS)
+
+
+    def __call__(self, value, clip=None):
+        result, is_scalar = self.process_value(value)
+        result = np.ma.array(np.interp(result.data, self.quantiles, self.levels),
+                             mask=np.ma.getmask(result), copy=False)
+
+        return result[0] if is_scalar else result
+
+
+    def inverse(self, value):
+        return np.interp(value, self.levels, self.quantiles)
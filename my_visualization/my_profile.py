@@ -0,0 +1,132 @@
+"""
+my_profile.py
+Per call and per stage timings of the drawing methods
+"""
+
+
+import logging
+import sys
+import time
+
+import numpy as np
+
+
+logger = logging.getLogger('my_visualization')
+
+
+def logcall(name, kws):
+    """Logging the keyword arguments of a call, arrays by their length"""
+    if not logger.isEnabledFor(logging.DEBUG): return
+
+    shown = {k: '<{} of {}>'.format(type(v).__name__, len(v))
+             if isinstance(v, (np.ndarray, list, tuple)) else v
+             for k, v in kws.items()}
+    logger.debug('"%s" is plotting using %s', name, shown)
+
+
+class Profiler:
+    """Timings and net allocated blocks of calls, split into stages
+
+    A call starts in the 'prepare' stage, the method then moves it to the
+    next stages, e.g. 'draw' for the matplotlib artists and 'style' for the
+    axes helpers. Calls made from within a call, e.g. rgba from encode,
+    add their own stages to the record of the outer one, which then goes
+    on in the stage it left.
+
+    net_blocks is the change of sys.getallocatedblocks(), the number of
+    Python objects allocated and not freed, so it is negative when a stage
+    frees more than it allocates, and misses the data buffers of arrays.
+    """
+
+    def __init__(self, callback=None):
+        """Profiler constructor
+
+        Parameters
+        ----------
+        callback : callable, optional
+            Called with every record
+        """
+        self.callback = callback
+        self.records = []
+
+        self.__record = None
+        self.__stages = []
+
+
+    def begin(self, name):
+        """Starting a call"""
+        if self.__stages:
+            now, blocks = self.__close()
+        else:
+            self.__record = {'call': name, 'time': 0.0, 'net_blocks': 0,
+                             'stages': {}}
+            now, blocks = time.perf_counter(), sys.getallocatedblocks()
+
+        self.__stages.append(('prepare', now, blocks))
+
+
+    def stage(self, name):
+        """Moving the current call to a new stage"""
+        if not self.__stages: return
+
+        now, blocks = self.__close()
+        self.__stages[-1] = (name, now, blocks)
+
+
+    def end(self):
+        """Ending a call, return its record, None for a call made from
+        within a call"""
+        now, blocks = self.__close()
+        self.__stages.pop()
+        if self.__stages:
+            self.__stages[-1] = (self.__stages[-1][0], now, blocks)
+            return None
+
+        record, self.__record = self.__record, None
+        for stage in record['stages'].values():
+            record['time'] += stage['time']
+            record['net_blocks'] += stage['net_blocks']
+
+        self.records.append(record)
+        logger.debug('"%s" took %.2f ms, %d net blocks, %s', record['call'],
+                     1e3 * record['time'], record['net_blocks'],
+                     ', '.join('{} {:.2f} ms'.format(k, 1e3 * v['time'])
+                               for k, v in record['stages'].items()))
+        if self.callback is not None: self.callback(record)
+
+        return record
+
+
+    def summary(self):
+        """Number of calls, time and net blocks per method and per stage"""
+        summary = {}
+        for record in self.records:
+            total = summary.setdefault(record['call'], {
+                'calls': 0, 'time': 0.0, 'net_blocks': 0, 'stages': {}})
+            total['calls'] += 1
+            total['time'] += record['time']
+            total['net_blocks'] += record['net_blocks']
+            for name, stage in record['stages'].items():
+                s = total['stages'].setdefault(name, {'time': 0.0, 'net_blocks': 0})
+                s['time'] += stage['time']
+                s['net_blocks'] += stage['net_blocks']
+
+        return summary
+
+
+    def clear(self):
+        """Dropping the records"""
+        self.records = []
+
+
+    def __close(self):
+        """Adding the current stage to the record of the call"""
+        now, blocks = time.perf_counter(), sys.getallocatedblocks()
+        name, start, first = self.__stages[-1]
+
+        stage = self.__record['stages'].setdefault(name, {'time': 0.0,
+                                                          'net_blocks': 0})
+        stage['time'] += now - start
+        stage['net_blocks'] += blocks - first
+
+        return now, blocks
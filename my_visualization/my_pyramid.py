@@ -0,0 +1,217 @@
+"""
+my_pyramid.py
+Multi-resolution (mipmap) pyramids of large 2D arrays
+"""
+
+
+import json
+import os
+
+import numpy as np
+
+import my_stream as stream
+
+
+class Pyramid:
+    """Mipmap pyramid of a 2D array
+
+    Level 0 is the array itself and level k + 1 averages 2 x 2 blocks of
+    level k, down to a level smaller than a tile. Levels are built tile row
+    by tile row, so the array may be memory-mapped, and the min/max of every
+    tile of every level is kept. With a directory, levels and stats are
+    written there and reused as long as the source file is unchanged.
+    """
+
+    def __init__(self, source, tile=1024, directory=None):
+        """Pyramid constructor
+
+        Parameters
+        ----------
+        source : 2D array, np.memmap or path to a .npy file
+        tile : int, optional
+            Size of the tiles, even
+        directory : str, optional
+            Where to persist the levels
+        """
+        self.tile = tile + tile % 2
+        self.directory = directory
+        self.levels = [stream.load(source)]
+        self.mins, self.maxs = [], []
+
+        signature = self.__signature(source)
+        if directory is not None and self.__load(signature): return
+
+        while True:
+            last = len(self.levels) - 1 == self.__depth()
+            mins, maxs, down = self.__build(self.levels[-1], last)
+            self.mins.append(mins)
+            self.maxs.append(maxs)
+            if last: break
+            self.levels.append(down)
+
+        if directory is not None: self.__save(signature)
+
+
+    @property
+    def shape(self):
+        """Shape of level 0"""
+        return self.levels[0].shape
+
+
+    def level(self, pixels, crop=None):
+        """Coarsest level with at least the given resolution over a crop
+
+        Parameters
+        ----------
+        pixels : tuple of int
+            Target (width, height) in pixels
+        crop : tuple of int, optional
+            (r0, r1, c0, c1) rows and columns of level 0, default: everything
+        """
+        r0, r1, c0, c1 = crop or (0, self.shape[0], 0, self.shape[1])
+        scale = min((c1 - c0) / max(pixels[0], 1), (r1 - r0) / max(pixels[1], 1))
+        k = int(np.floor(np.log2(scale))) if scale >= 1 else 0
+
+        return min(max(k, 0), len(self.levels) - 1)
+
+
+    def read(self, k, crop=None):
+        """Reading the blocks of level k which cover a crop of level 0
+
+        Parameters
+        ----------
+        k : int
+        crop : tuple of int, optional
+            (r0, r1, c0, c1) rows and columns of level 0
+
+        Returns
+        -------
+        data : 2D array
+        extent : tuple
+            imshow extent of data, in the pixel units of level 0
+        limits : tuple
+            (min, max) over the tiles covering data
+        """
+        r0, r1, c0, c1 = self.__blocks(k, crop)
+        f = 2**k
+        data = np.asarray(self.levels[k][r0:r1, c0:c1])
+
+        t = self.tile
+        mins = self.mins[k][r0 // t:-(-r1 // t), c0 // t:-(-c1 // t)]
+        maxs = self.maxs[k][r0 // t:-(-r1 // t), c0 // t:-(-c1 // t)]
+
+        with np.errstate(invalid='ignore'):
+            limits = (np.nanmin(mins) if np.isfinite(mins).any() else np.nan,
+                      np.nanmax(maxs) if np.isfinite(maxs).any() else np.nan)
+
+        extent = (c0 * f - 0.5, min(c1 * f, self.shape[1]) - 0.5,
+                  min(r1 * f, self.shape[0]) - 0.5, r0 * f - 0.5)
+
+        return data, extent, limits
+
+
+    def __blocks(self, k, crop):
+        """Rows and columns of level k covering a crop of level 0"""
+        if crop is None:
+            nr, nc = self.levels[k].shape[:2]
+            return 0, nr, 0, nc
+
+        f = 2**k
+        r0, r1, c0, c1 = crop
+        return r0 // f, -(-r1 // f), c0 // f, -(-c1 // f)
+
+
+    def __depth(self):
+        """Index of the coarsest level"""
+        size = max(self.shape[:2])
+        return max(0, int(np.ceil(np.log2(size / self.tile))))
+
+
+    def __build(self, array, last):
+        """Tile stats of a level and, unless last, the next level"""
+        t = self.tile
+        nr, nc = array.shape[:2]
+        ntr, ntc = -(-nr // t), -(-nc // t)
+        rows = min(t, max(2, stream.CHUNKSIZE // max(nc, 1) // 2 * 2))
+
+        mins = np.full((ntr, ntc), np.nan)
+        maxs = np.full((ntr, ntc), np.nan)
+        down = None if last else self.__allocate(len(self.levels),
+                                                 (-(-nr // 2), -(-nc // 2)))
+
+        start = 0
+        while start < nr:
+            i = start // t
+            stop = min(start + rows, (i + 1) * t, nr)
+            band = np.asarray(array[start:stop])
+
+            for j in range(ntc):
+                block = band[:, j * t:(j + 1) * t]
+                values = block[np.isfinite(block)]
+                if values.size == 0: continue
+                mins[i, j] = np.fmin(mins[i, j], values.min())
+                maxs[i, j] = np.fmax(maxs[i, j], values.max())
+
+            if down is not None:
+                down[start // 2:-(-stop // 2)] = stream.blockmean(band, 2)
+
+            start = stop
+
+        return mins, maxs, down
+
+
+    def __allocate(self, k, shape):
+        """Level k, in the floating dtype of the source or float32"""
+        dtype = self.levels[0].dtype
+        if not np.issubdtype(dtype, np.floating): dtype = np.float32
+        if self.directory is None: return np.empty(shape, dtype=dtype)
+
+        os.makedirs(self.directory, exist_ok=True)
+        return np.lib.format.open_memmap(self.__path(k), mode='w+',
+                                         dtype=dtype, shape=shape)
+
+
+    def __path(self, k):
+        return os.path.join(self.directory, 'level_{}.npy'.format(k))
+
+
+    def __signature(self, source):
+        """Description of the source, to detect stale persisted levels"""
+        signature = {'shape': list(self.shape), 'tile': self.tile}
+        if isinstance(source, (str, os.PathLike)):
+            stat = os.stat(source)
+            signature.update(path=os.path.abspath(source), size=stat.st_size,
+                             mtime=stat.st_mtime_ns)
+        else:
+            signature.update(persisted=False)
+
+        return signature
+
+
+    def __save(self, signature):
+        for level in self.levels[1:]:
+            if isinstance(level, np.memmap): level.flush()
+
+        np.savez(os.path.join(self.directory, 'stats.npz'),
+                 *(self.mins + self.maxs))
+        with open(os.path.join(self.directory, 'pyramid.json'), 'w') as f:
+            json.dump(signature, f)
+
+
+    def __load(self, signature):
+        """Reusing persisted levels, return whether they are up to date"""
+        try:
+            with open(os.path.join(self.directory, 'pyramid.json')) as f:
+                if json.load(f) != signature or 'path' not in signature: return False
+
+            stats = np.load(os.path.join(self.directory, 'stats.npz'))
+            n = len(stats.files) // 2
+            levels = [np.load(self.__path(k), mmap_mode='r') for k in range(1, n)]
+        except (OSError, ValueError):
+            return False
+
+        arrays = [stats['arr_{}'.format(i)] for i in range(2 * n)]
+        self.levels += levels
+        self.mins, self.maxs = arrays[:n], arrays[n:]
+
+        return True
@@ -0,0 +1,187 @@
+"""
+my_spec.py
+Declarative figure descriptions, compiled into reusable render plans
+"""
+
+
+import json
+import os
+
+
+SERIES = ('plot', 'plot_many', 'errorbar', 'errorbar_many', 'scatter', 'image',
+          'hist', 'hist2d', 'density', 'arrow', 'plot3d', 'scatter3d')
+STYLE = ('xlabel', 'ylabel', 'zlabel', 'xscale', 'yscale', 'zscale',
+         'xmin', 'xmax', 'ymin', 'ymax', 'zmin', 'zmax')
+
+
+def load(spec):
+    """Return a figure spec as a dict
+
+    Parameter
+    ---------
+    spec : dict, JSON string or path to a .json, .yaml or .yml file
+        YAML files need PyYAML
+    """
+    if isinstance(spec, dict): return spec
+
+    if os.path.isfile(spec):
+        with open(spec) as f:
+            if os.path.splitext(spec)[1].lower() in ('.yaml', '.yml'):
+                import yaml
+                return yaml.safe_load(f)
+            return json.load(f)
+
+    return json.loads(spec)
+
+
+class Plan:
+    """Figure spec compiled into a render plan
+
+    A spec describes the figure and its axes::
+
+        {'figure': {'cscheme': 'RAINBOW', 'dpi': 100},
+         'data': {'x': [0, 1, 2]},
+         'axes': [{'pos': '121', 'xlabel': 't', 'ymin': 0,
+                   'series': [{'kind': 'plot', 'data': ['x', 'y'],
+                               'label': 'y', 'reduce': 'auto'}],
+                   'coaxes': [{'ticksloc': [1, 2], 'ticklabels': ['a', 'b'],
+                               'label': 'top'}],
+                   'legend': {'loc': 'upper left'}},
+                  {'pos': '122', 'projection': '3d',
+                   'series': [{'kind': 'scatter3d', 'data': ['x', 'y', 'z']}]}]}
+
+    'figure' holds keyword arguments of MyVisualization. Every series is
+    a drawing method ('kind'), its positional arguments ('data') and its
+    keyword arguments. Strings in 'data' are names of arrays, given at
+    render time or in the 'data' of the spec, other strings (e.g. paths to
+    .npy files) and values are passed as they are.
+
+    Compiling resolves the axes keyword arguments (labels, scales and
+    limits, at the axes or at any of its series level) once: every series
+    receives them to reduce its data, while the axes are only styled once,
+    after all of their series are drawn. The parameters of the series
+    (colors, labels, ...) are resolved once per color scheme, see params.
+
+    render draws the plan on one figure, kept by the plan: rendering it
+    again with new data only redraws the series over the same axes, as
+    does rendering another plan of the same layout.
+    """
+
+    def __init__(self, spec):
+        """Plan constructor
+
+        Parameter
+        ---------
+        spec : dict, JSON string or path to a JSON/YAML file
+        """
+        spec = load(spec)
+
+        self.figure = dict(spec.get('figure', {}))
+        self.data = dict(spec.get('data', {}))
+        self.axes = [self.__compile(a) for a in spec.get('axes', [])]
+
+        positions = [a['pos'] for a in self.axes]
+        if len(set(positions)) != len(positions):
+            raise ValueError('Several axes at the same pos: {}'.format(positions))
+
+        # Axes, their styling and their coaxes, the series aside: plans with
+        # the same layout are drawn over the same axes
+        self.layout = repr([{k: v for k, v in a.items()
+                             if k not in ('series', 'legend')} for a in self.axes])
+
+        self.vis = None
+        self.__params = {}
+
+
+    def inputs(self):
+        """Names of the arrays referenced by the series"""
+        return sorted({ref for a in self.axes for _, refs, _ in a['series']
+                       for ref in refs if isinstance(ref, str)})
+
+
+    def params(self, defaults):
+        """Parameters of every series, per axes, resolved over defaults
+        (see MyVisualization.defaults) once and reused afterwards"""
+        key = tuple(defaults)
+        if key not in self.__params:
+            self.__params[key] = [[{name: kws.get(name, value)
+                                    for name, value in defaults}
+                                   for _, _, kws in a['series']]
+                                  for a in self.axes]
+
+        return self.__params[key]
+
+
+    def bind(self, refs, data=None):
+        """Positional arguments of a series, with the names replaced by
+        their arrays from data, or from the data of the spec"""
+        data = data or {}
+        return [data[r] if isinstance(r, str) and r in data else
+                self.data[r] if isinstance(r, str) and r in self.data else r
+                for r in refs]
+
+
+    def render(self, data=None, name=None, **kws):
+        """Drawing the plan on its MyVisualization, created on first use
+
+        Parameters
+        ----------
+        data : dict, optional
+            Arrays referenced by the series
+        name : str, file-like object or list of them, optional
+            Saving the figure there
+
+        Keyword Arguments
+        -----------------
+        Passed to save
+
+        Returns
+        -------
+        vis : MyVisualization, or the result of save if name is given. The
+            figure is redrawn by the next render, until close().
+        """
+        if self.vis is None:
+            from main import MyVisualization
+            self.vis = MyVisualization(**dict({'pyplot': False}, **self.figure))
+
+        self.vis.render(self, data)
+        if name is None: return self.vis
+
+        return self.vis.save(name, **kws)
+
+
+    def close(self):
+        """Releasing the figure of render"""
+        if self.vis is not None: self.vis.close()
+        self.vis = None
+
+
+    @staticmethod
+    def __compile(axes):
+        pos = str(axes.get('pos', '111'))
+        style = {k: axes[k] for k in STYLE if k in axes}
+
+        series = []
+        for s in axes.get('series', []):
+            s = dict(s)
+            kind = s.pop('kind', 'plot')
+            if kind not in SERIES:
+                raise ValueError('Unknown series kind: {}, should be one of {}'.format(
+                    kind, ', '.join(SERIES)))
+
+            refs = s.pop('data', [])
+            refs = [refs] if isinstance(refs, str) else list(refs)
+            for k in STYLE:
+                if k in s: style.setdefault(k, s.pop(k))
+
+            series.append((kind, refs, dict({'silent': True}, **s)))
+
+        series = [(kind, refs, dict(style, **kws)) for kind, refs, kws in series]
+        legend = axes.get('legend')
+        legend = {} if legend is True else dict(legend) if legend else None
+
+        return {'pos': pos, 'projection': axes.get('projection'),
+                'sharex': axes.get('sharex'), 'sharey': axes.get('sharey'),
+                'style': style, 'series': series,
+                'coaxes': [dict(c) for c in axes.get('coaxes', [])],
+                'legend': legend}
@@ -0,0 +1,201 @@
+"""
+my_stream.py
+Reading arrays, memory-mapped arrays, .npy files and iterators of chunks
+with bounded memory
+"""
+
+
+import os
+import numpy as np
+
+
+CHUNKSIZE = 1 << 22
+
+
+def isstream(*sources):
+    """Whether any of the sources should be read chunk by chunk
+
+    Parameter
+    ---------
+    sources : arrays, np.memmap, paths to .npy files or iterators of chunks
+    """
+    for source in sources:
+        if isinstance(source, (str, os.PathLike, np.memmap)): return True
+        if _isiterator(source): return True
+
+    return False
+
+
+def load(source):
+    """Return an array-like from an array or a .npy path, memory-mapped
+
+    Parameter
+    ---------
+    source : array, np.memmap or path to a .npy file
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return np.load(source, mmap_mode='r')
+
+    return source if isinstance(source, np.ndarray) else np.asarray(source)
+
+
+def chunks(xs, ys=None, chunksize=CHUNKSIZE):
+    """Iterating over (xs, ys) chunks of a pair of sources
+
+    Parameters
+    ----------
+    xs, ys : array, np.memmap, path to a .npy file or iterator of chunks
+        If ys is None, xs should yield (xs, ys) chunk pairs
+    chunksize : int, optional
+        Number of elements per chunk, for array sources
+    """
+    if ys is None:
+        pairs = xs
+    else:
+        pairs = zip(blocks(xs, chunksize), blocks(ys, chunksize))
+
+    for x, y in pairs:
+        yield np.asarray(x), np.asarray(y)
+
+
+def blocks(source, chunksize=CHUNKSIZE):
+    """Iterating over the chunks of a single source
+
+    Parameters
+    ----------
+    source : array, np.memmap, path to a .npy file or iterator of chunks
+    chunksize : int, optional
+        Number of elements per chunk, for array sources
+    """
+    if _isiterator(source):
+        yield from source
+        return
+
+    array = load(source)
+    for i in range(0, len(array), chunksize):
+        yield array[i:i + chunksize]
+
+
+def limits(source, log=False, chunksize=CHUNKSIZE):
+    """(min, max) of the finite values of a source, read chunk by chunk
+
+    Parameters
+    ----------
+    source : array, np.memmap or path to a .npy file
+    log : bool, optional
+        Only considering the positive values
+    """
+    if _isiterator(source):
+        raise ValueError('The limits of an iterator cannot be read before '
+                         'binning it, give them instead')
+
+    lo, hi = np.inf, -np.inf
+    for block in blocks(source, chunksize):
+        block = np.asarray(block)
+        keep = np.isfinite(block)
+        if log: keep &= block > 0
+        if keep.any():
+            values = block[keep]
+            lo, hi = min(lo, values.min()), max(hi, values.max())
+
+    if lo > hi: return (1.0, 10.0) if log else (0.0, 1.0)
+    return float(lo), float(hi)
+
+
+def image(source, pixels, chunksize=CHUNKSIZE):
+    """Block-averaging a 2D array down to about the given pixel size, row
+    block by row block
+
+    Parameters
+    ----------
+    source : 2D array, np.memmap, path to a .npy file or iterator of row blocks
+    pixels : tuple of int
+        Target (width, height) in pixels
+
+    Returns
+    -------
+    reduced : 2D array
+    extent : tuple
+        imshow extent of the reduced image in the pixel units of source.
+        The last row and column blocks are averaged over the pixels they
+        cover but drawn at the size of a full block, so that every block
+        keeps its true position and size: the extent overhangs the source
+        by less than a block.
+    limits : tuple
+        Exact (min, max) of the finite values of source
+    area : tuple
+        (left, right, bottom, top) of the source itself, the view to keep
+    """
+    pw, ph = pixels
+
+    if _isiterator(source):
+        first = np.asarray(next(source))
+        ncols = first.shape[1]
+        f = max(1, -(-ncols // pw))
+        blocks = _prepend(first, source)
+    else:
+        array = load(source)
+        nrows, ncols = array.shape[:2]
+        f = max(1, -(-ncols // pw), -(-nrows // ph))
+        step = max(f, chunksize // max(ncols, 1) // f * f)
+        blocks = (array[i:i + step] for i in range(0, nrows, step))
+
+    reduced, pending, nrows = [], None, 0
+    lo, hi = np.inf, -np.inf
+
+    for block in blocks:
+        block = np.asarray(block)
+        nrows += block.shape[0]
+
+        finite = block[np.isfinite(block)]
+        if finite.size > 0:
+            lo, hi = min(lo, finite.min()), max(hi, finite.max())
+
+        if pending is not None: block = np.concatenate([pending, block])
+        full = block.shape[0] // f * f
+        if full > 0: reduced.append(blockmean(block[:full], f))
+        pending = block[full:] if full < block.shape[0] else None
+
+    if pending is not None: reduced.append(blockmean(pending, f))
+
+    reduced = np.concatenate(reduced)
+    height, width = reduced.shape[0] * f, reduced.shape[1] * f
+    extent = (-0.5, width - 0.5, height - 0.5, -0.5)
+    area = (-0.5, ncols - 0.5, nrows - 0.5, -0.5)
+
+    return reduced, extent, (lo, hi), area
+
+
+def blockmean(block, f):
+    """Mean over f x f blocks, ignoring NaNs and the padding of edge blocks
+
+    Parameters
+    ----------
+    block : 2D array
+    f : int
+        Size of the blocks
+    """
+    if f == 1: return np.asarray(block, dtype=np.float64)
+
+    r, c = block.shape
+    nr, nc = -(-r // f), -(-c // f)
+
+    padded = np.full((nr * f, nc * f), np.nan)
+    padded[:r, :c] = block
+    padded = padded.reshape(nr, f, nc, f)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (np.nansum(padded, axis=(1, 3)) /
+                np.sum(~np.isnan(padded), axis=(1, 3)))
+
+
+def _isiterator(source):
+    try:
+        return iter(source) is source
+    except TypeError:
+        return False
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest